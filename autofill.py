@@ -1,3 +1,6 @@
+import argparse
+import itertools
+import os
 import time
 import pandas as pd
 import datetime
@@ -12,7 +15,23 @@ from selenium.common.exceptions import (
     NoSuchElementException, TimeoutException, StaleElementReferenceException
 )
 
+import bitacora as bitacora_mod
+import calculo
+import entrada
+from bitacora import Bitacora
+from campos import llenar_seccion, seleccionar_opcion
+from validacion import guardar_rechazos, validar
+import localizadores
+import reintentos
+import salud as salud_mod
+import trazas
+from localizadores import ubicar
+from trazas import percentil, tramo
+from esperas import POLL_AJAX, TIMEOUT_AJAX, esperar_ajax, ejecutar_y_esperar
+
 # --- Funciones auxiliares ---
+# Ambas esperan a que la página esté inactiva antes y después de actuar, así que
+# el siguiente paso nunca corre contra un componente a medio actualizar.
 def wait_and_click(driver, by, selector, timeout=10):
     def _clickable(d):
         try:
@@ -21,423 +40,635 @@ def wait_and_click(driver, by, selector, timeout=10):
                 elem.click()
                 return True
             return False
-        except StaleElementReferenceException:
+        except (StaleElementReferenceException, NoSuchElementException):
             return False
+    esperar_ajax(driver)
     WebDriverWait(driver, timeout).until(_clickable)
+    esperar_ajax(driver)
 
-def safe_send_keys(driver, campo_id, valor, intentos=3):
-    for intento in range(intentos):
-        try:
-            elem = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.ID, campo_id))
-            )
-            elem.clear()
-            elem.send_keys(valor)
-            return True
-        except (StaleElementReferenceException, TimeoutException):
-            print(f"⚠️ Intento {intento+1}: no se pudo escribir en {campo_id}, reintentando...")
-            time.sleep(0.5)
-    raise RuntimeError(f"❌ No se pudo escribir en {campo_id} después de {intentos} intentos")
-
-# --- Conexión al Chrome en modo depuración ---
-options = webdriver.ChromeOptions()
-options.debugger_address = "127.0.0.1:9222"
-driver = webdriver.Chrome(options=options)
-
-driver.get("https://sut.trabajo.gob.ec/mrl/empresa/actas/registroActaFrm.xhtml")
-time.sleep(3)
-
-# --- Leer Excel ---
-df_datos = pd.read_excel(r"autofill_sut\datos.xlsx", dtype=str)
-if 'Enviado' not in df_datos.columns:
-    df_datos['Enviado'] = ""
-
-# --- Tomar primera fila no enviada ---
-fila = df_datos[df_datos['Enviado'] != "Sí"].head(1)
-if fila.empty:
-    print("❌ No hay registros pendientes para procesar")
-    driver.quit()
-else:
-    row = fila.iloc[0]
-    identificacion = row['Identificacion']
-    fecha_salida = row['Fecha de Salida'] if 'Fecha de Salida' in row else ''
-    remuneracion = row['Remuneracion']
-    causa = row['Causa']
-    mes = row['Mes']
-    anio = row['Año']
-    salario_pendiente = row['Salario_pendiente']
-    sueldo_nominal = row['Sueldo_nominal']
-    horas_suplementarias = row['Horas_suplementarias']
-    horas_extraordinarias = row['Horas_extraordinarias']
-    horas_nocturnas = row['Horas_nocturnas']
-    cumplimiento_laboral = row['Cumplimiento_laboral']
-    comision_por_responsabilidad = row['Comision_por_responsabilidad']
-    total_rem_pendiente = row['Total_remuneracion_pendiente']
-    fondo_reserva = row['Fondo de reserva'].strip().lower()
-    valor_fr = row['Valor FR']
-    xiii = row['XIII'].strip().lower()
-    fecha_xiii = row['Fecha XIII'] if 'Fecha XIII' in row else ''
-    obs_xiii = row['Obs XIII'] if 'Obs XIII' in row else ''
-
-    # --- Pasos críticos con reintento ---
-    MAX_INTENTOS = 5
-    for intento in range(MAX_INTENTOS):
-        try:
-            # Seleccionar "Identificación"
-            tipo_busqueda = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "frmLegal:tipoDiscapacidad_input"))
-            )
-            driver.execute_script(
-                "arguments[0].value='I'; arguments[0].dispatchEvent(new Event('change'));", tipo_busqueda
-            )
-            driver.execute_script(
-                "PrimeFaces.ab({s:'frmLegal:tipoDiscapacidad',e:'valueChange',f:'frmLegal',p:'frmLegal:fldFiltro',u:'frmLegal:fldFiltro',ps:true});"
-            )
-            time.sleep(0.5)
-
-            # Escribir identificación
-            safe_send_keys(driver, "frmLegal:j_idt81", identificacion)
-
-            # Presionar Buscar
-            btn_buscar = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.ID, "frmLegal:j_idt83"))
-            )
-            btn_buscar.click()
-
-            # Esperar fila con la identificación
-            fila_encontrada = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, f"//td[contains(text(), '{identificacion}')]"))
-            )
+def safe_send_keys(driver, campo_id, valor):
+    def _escribir():
+        esperar_ajax(driver)
+        elem = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.ID, campo_id))
+        )
+        elem.clear()
+        elem.send_keys(valor)
+        return True
+    return reintentos.ejecutar("escribir", _escribir, detalle=campo_id)
 
-            # Generar Acta Finiquito
-            btn_generar = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.ID, "frmLegal:j_idt98:0:j_idt115"))
-            )
-            btn_generar.click()
+RUTA_DATOS = r"autofill_sut\datos.xlsx"
+RUTA_BITACORA = r"autofill_sut\bitacora.sqlite3"
+RUTA_RECHAZOS = r"autofill_sut\rechazos.csv"
+URL_FORMULARIO = "https://sut.trabajo.gob.ec/mrl/empresa/actas/registroActaFrm.xhtml"
+DEBUGGER_ADDRESS = "127.0.0.1:9222"
 
-            # Validar formulario
-            input_ident_form = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "frmLegal:identificacion"))
-            )
-            if input_ident_form.get_attribute("value") == identificacion:
-                print(f"✅ Pasos críticos completados para identificación {identificacion}")
-                break
-        except Exception as e:
-            print(f"⚠️ Intento {intento+1} fallido: {e}")
-            time.sleep(1)
-    else:
-        raise RuntimeError("❌ No se pudieron completar los pasos críticos después de 3 intentos")
-
-    # --- Rellenar remuneración principal ---
-    input_remu = WebDriverWait(driver, 5).until(
-        EC.presence_of_element_located((By.ID, "frmLegal:remuneracion"))
+# --- Conexión al Chrome en modo depuración ---
+def conectar_driver(debugger_address=DEBUGGER_ADDRESS):
+    options = webdriver.ChromeOptions()
+    options.debugger_address = debugger_address
+    return webdriver.Chrome(options=options)
+
+def cargar_formulario(driver, url=URL_FORMULARIO):
+    driver.get(url)
+    WebDriverWait(driver, TIMEOUT_AJAX).until(
+        EC.presence_of_element_located((By.ID, "frmLegal:tipoDiscapacidad_input"))
     )
-    driver.execute_script("""
-        arguments[0].value = arguments[1];
-        arguments[0].dispatchEvent(new Event('input'));
-        arguments[0].dispatchEvent(new Event('change'));
-    """, input_remu, remuneracion)
-
-    # --- Seleccionar causa ---
-    def seleccionar_causa(driver, causa_num, intentos=3):
-        for intento in range(intentos):
-            try:
-                fila_causa = driver.find_element(
-                    By.XPATH,
-                    f"//tbody[@id='frmLegal:j_idt374_data']/tr/td[1][text()='{causa_num}']/.."
-                )
-                if fila_causa.get_attribute("aria-selected") == "true":
-                    print(f"✅ Causa {causa_num} ya aplicada")
-                    return True
-                ActionChains(driver).move_to_element(fila_causa).click().perform()
-                time.sleep(1.5)
-                print(f"✅ Causa {causa_num} aplicada correctamente")
-                return True
-            except Exception as e:
-                print(f"⚠️ Intento {intento+1}: no se pudo seleccionar la causa {causa_num}: {e}")
-                time.sleep(1)
-        raise RuntimeError(f"❌ No se pudo aplicar la causa {causa_num} después de {intentos} intentos")
+    esperar_ajax(driver)
+    localizadores.actual().al_cargar(driver)
+
+def volver_a_busqueda(driver, url=URL_FORMULARIO):
+    # Entre filas se reutiliza la sesión: si el filtro de búsqueda sigue visible
+    # no hace falta navegar. Con un acta abierta el SUT oculta el filtro y las
+    # peticiones AJAX no dejan entradas en el historial, así que se recarga directo.
+    elems = driver.find_elements(By.ID, "frmLegal:tipoDiscapacidad_input")
+    if elems and elems[0].is_displayed():
+        return
+    cargar_formulario(driver, url)
+
+# Busca la identificación solo dentro de la tabla de resultados y devuelve el
+# id del botón "Generar Acta" de esa fila
+_JS_FILA_RESULTADO = """
+    var tabla = document.getElementById(arguments[0]);
+    if (!tabla) { return null; }
+    var cuerpo = document.getElementById(arguments[0] + '_data') || tabla.querySelector('tbody');
+    for (var i = 0; cuerpo && i < cuerpo.rows.length; i++) {
+        var fila = cuerpo.rows[i];
+        if (fila.textContent.indexOf(arguments[1]) >= 0) {
+            var boton = fila.querySelector('button[id], a[id]');
+            return { boton: boton ? boton.id : null };
+        }
+    }
+    return null;
+"""
+
+# --- Pasos críticos con reintento ---
+def pasos_criticos(driver, identificacion):
+    def _intento():
+        # Seleccionar "Identificación"
+        tipo_busqueda = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((By.ID, "frmLegal:tipoDiscapacidad_input"))
+        )
+        driver.execute_script(
+            "arguments[0].value='I'; arguments[0].dispatchEvent(new Event('change'));", tipo_busqueda
+        )
+        ejecutar_y_esperar(driver, "frmLegal:fldFiltro", lambda: driver.execute_script(
+            "PrimeFaces.ab({s:'frmLegal:tipoDiscapacidad',e:'valueChange',f:'frmLegal',p:'frmLegal:fldFiltro',u:'frmLegal:fldFiltro',ps:true});"
+        ))
 
-    seleccionar_causa(driver, causa)
+        # Escribir identificación
+        safe_send_keys(driver, ubicar(driver, "filtro_identificacion"), identificacion)
 
-    # --- Agregar Remuneración pendiente ---
-    def agregar_remuneracion(driver, salario_pendiente, mes, anio, sueldo_nominal,
-                            horas_suplementarias, horas_extraordinarias, horas_nocturnas):
-        if float(salario_pendiente) <= 0:
-            print("ℹ️ Salario pendiente <= 0, se omite agregar remuneración pendiente")
-            return False
+        # Presionar Buscar
+        wait_and_click(driver, By.ID, ubicar(driver, "buscar"), timeout=5)
 
-        wait_and_click(driver, By.ID, "frmLegal:j_idt574")
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.ID, "frmLegal:dttRemu001_data"))
+        # Esperar fila con la identificación
+        tabla = ubicar(driver, "tabla_resultados")
+        fila_encontrada = WebDriverWait(driver, 5).until(
+            lambda d: d.execute_script(_JS_FILA_RESULTADO, tabla, identificacion)
         )
 
-        # --- Desplegar y confirmar Mes ---
-        mes_label = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "frmLegal:dttRemu001:0:j_idt578_label"))
-        )
-        mes_inicial = mes_label.text
-        if mes_inicial != mes:
-            mes_label.click()
-            print("📌 Lista de Mes desplegada. Por favor selecciona el mes manualmente.")
-            WebDriverWait(driver, 300).until(
-                lambda d: d.find_element(By.ID, "frmLegal:dttRemu001:0:j_idt578_label").text != mes_inicial
-            )
-        mes_seleccionado = driver.find_element(By.ID, "frmLegal:dttRemu001:0:j_idt578_label").text
-        print(f"✅ Mes confirmado: {mes_seleccionado}")
+        # Generar Acta Finiquito
+        btn_generar = fila_encontrada["boton"] or f"{tabla}:0:j_idt115"
+        wait_and_click(driver, By.ID, btn_generar, timeout=5)
 
-        # --- Desplegar y confirmar Año ---
-        anio_label = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "frmLegal:dttRemu001:0:j_idt580_label"))
+        # Validar formulario
+        input_ident_form = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((By.ID, "frmLegal:identificacion"))
         )
-        anio_inicial = anio_label.text
-        if anio_inicial != anio:
-            ActionChains(driver).move_to_element(anio_label).click().perform()
-            print("📌 Lista de Año desplegada. Por favor selecciona el año manualmente.")
-            WebDriverWait(driver, 300).until(
-                lambda d: d.find_element(By.ID, "frmLegal:dttRemu001:0:j_idt580_label").text != anio_inicial
-            )
-        anio_seleccionado = driver.find_element(By.ID, "frmLegal:dttRemu001:0:j_idt580_label").text
-        print(f"✅ Año confirmado: {anio_seleccionado}")
+        if input_ident_form.get_attribute("value") != identificacion:
+            raise RuntimeError(f"el formulario abrió otra identificación ({input_ident_form.get_attribute('value')})")
+        print(f"✅ Pasos críticos completados para identificación {identificacion}")
+        return True
 
-        wait_and_click(driver, By.ID, "frmLegal:dttRemu001:0:btRemu000001")
+    def _al_fallar(error):
+        localizadores.actual().invalidar()
+        esperar_ajax(driver)
 
-        # --- Llenar diálogo de remuneración ---
-        campos_script = {
-            "frmLegal:txtDlg001": salario_pendiente,
-            "frmLegal:txtDlg0012": sueldo_nominal
-        }
-        for campo_id, valor in campos_script.items():
-            elem = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.ID, campo_id)))
-            driver.execute_script("""
-                arguments[0].value = arguments[1];
-                arguments[0].dispatchEvent(new Event('input'));
-                arguments[0].dispatchEvent(new Event('change'));
-            """, elem, valor)
-
-        campos_sendkeys = {
-            "frmLegal:txtDlg002": horas_suplementarias,
-            "frmLegal:txtDlg004": horas_extraordinarias,
-            "frmLegal:txtDlg004n": horas_nocturnas
-        }
-        for campo_id, valor in campos_sendkeys.items():
-            safe_send_keys(driver, campo_id, valor)
+    return reintentos.ejecutar("pasos_criticos", _intento, _al_fallar, identificacion)
 
-        wait_and_click(driver, By.ID, "frmLegal:btnDlg003")
-        print("✅ Remuneración pendiente procesada")
+# --- Seleccionar causa ---
+def seleccionar_causa(driver, causa_num):
+    def _seleccionar():
+        fila_causa = localizadores.actual().fila_causa(driver, causa_num)
+        if fila_causa is None:
+            raise NoSuchElementException(f"La causa {causa_num} no está en la tabla de causas")
+        if fila_causa.get_attribute("aria-selected") == "true":
+            print(f"✅ Causa {causa_num} ya aplicada")
+            return True
+        ActionChains(driver).move_to_element(fila_causa).click().perform()
+        esperar_ajax(driver)
+        print(f"✅ Causa {causa_num} aplicada correctamente")
         return True
 
-    # --- Fondo de Reserva ---
-    def procesar_fondo_reserva(driver, fondo_reserva, valor_fr):
-        fondo_reserva = fondo_reserva.strip().lower()
+    def _al_fallar(error):
+        localizadores.actual().invalidar()
+        esperar_ajax(driver)
 
-        if fondo_reserva == "si":
-            # --- Seleccionar radio 'Sí' vía JS ---
-            radio_si = driver.find_element(By.ID, "frmLegal:j_idt590:0")
-            driver.execute_script("arguments[0].checked = true; arguments[0].dispatchEvent(new Event('change'));", radio_si)
-            print("✅ Radio 'Sí' seleccionado automáticamente (JS)")
+    return reintentos.ejecutar("seleccionar_causa", _seleccionar, _al_fallar, causa_num)
 
-            # Presionar botón para agregar Fondo de Reserva
-            btn_agregar_fr = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.ID, "frmLegal:j_idt598"))
-            )
-            btn_agregar_fr.click()
-            time.sleep(0.5)
+# --- Agregar Remuneración pendiente ---
+def agregar_remuneracion(driver, salario_pendiente, mes, anio, sueldo_nominal,
+                        horas_suplementarias, horas_extraordinarias, horas_nocturnas):
+    if float(salario_pendiente) <= 0:
+        print("ℹ️ Salario pendiente <= 0, se omite agregar remuneración pendiente")
+        return False
 
-            # --- Desplegar y confirmar Mes FR ---
-            mes_label = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "frmLegal:j_idt600:0:j_idt602_label"))
-            )
-            mes_inicial = mes_label.text
-            if mes_inicial != mes:
-                mes_label.click()
-                print("📌 Lista de Mes del FR desplegada. Por favor selecciona el mes manualmente.")
-                WebDriverWait(driver, 300).until(
-                    lambda d: d.find_element(By.ID, "frmLegal:j_idt600:0:j_idt602_label").text != mes_inicial
-                )
-            mes_seleccionado = driver.find_element(By.ID, "frmLegal:j_idt600:0:j_idt602_label").text
-            print(f"✅ Mes FR confirmado: {mes_seleccionado}")
+    wait_and_click(driver, By.ID, ubicar(driver, "agregar_remuneracion"))
+    WebDriverWait(driver, 5).until(
+        EC.presence_of_element_located((By.ID, "frmLegal:dttRemu001_data"))
+    )
 
-            # --- Desplegar y confirmar Año FR ---
-            anio_label = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "frmLegal:j_idt600:0:j_idt604_label"))
-            )
-            anio_inicial = anio_label.text
-            if anio_inicial != anio:
-                ActionChains(driver).move_to_element(anio_label).click().perform()
-                print("📌 Lista de Año del FR desplegada. Por favor selecciona el año manualmente.")
-                WebDriverWait(driver, 300).until(
-                    lambda d: d.find_element(By.ID, "frmLegal:j_idt600:0:j_idt604_label").text != anio_inicial
-                )
-            anio_seleccionado = driver.find_element(By.ID, "frmLegal:j_idt600:0:j_idt604_label").text
-            print(f"✅ Año FR confirmado: {anio_seleccionado}")
+    # --- Seleccionar y confirmar Mes y Año ---
+    WebDriverWait(driver, 10).until(
+        lambda d: d.find_elements(By.ID, f"{ubicar(d, 'mes_remuneracion')}_label")
+    )
+    mes_seleccionado = seleccionar_opcion(driver, ubicar(driver, "mes_remuneracion"), mes)
+    print(f"✅ Mes confirmado: {mes_seleccionado}")
+    anio_seleccionado = seleccionar_opcion(driver, ubicar(driver, "anio_remuneracion"), anio)
+    print(f"✅ Año confirmado: {anio_seleccionado}")
+
+    wait_and_click(driver, By.ID, "frmLegal:dttRemu001:0:btRemu000001")
+
+    # --- Llenar diálogo de remuneración ---
+    llenar_seccion(driver, "dialogo_remuneracion", {
+        "Salario_pendiente": salario_pendiente,
+        "Sueldo_nominal": sueldo_nominal,
+        "Horas_suplementarias": horas_suplementarias,
+        "Horas_extraordinarias": horas_extraordinarias,
+        "Horas_nocturnas": horas_nocturnas,
+    })
+
+    wait_and_click(driver, By.ID, "frmLegal:btnDlg003")
+    print("✅ Remuneración pendiente procesada")
+    return True
+
+# --- Fondo de Reserva ---
+def procesar_fondo_reserva(driver, fondo_reserva, valor_fr, mes, anio):
+    fondo_reserva = fondo_reserva.strip().lower()
+
+    if fondo_reserva == "si":
+        # --- Seleccionar radio 'Sí' vía JS ---
+        radio_si = driver.find_element(By.ID, f"{ubicar(driver, 'fondo_reserva')}:0")
+        driver.execute_script("arguments[0].checked = true; arguments[0].dispatchEvent(new Event('change'));", radio_si)
+        print("✅ Radio 'Sí' seleccionado automáticamente (JS)")
+
+        # Presionar botón para agregar Fondo de Reserva
+        wait_and_click(driver, By.ID, ubicar(driver, "agregar_fondo_reserva"), timeout=5)
+
+        # --- Seleccionar y confirmar Mes y Año FR ---
+        WebDriverWait(driver, 10).until(
+            lambda d: d.find_elements(By.ID, f"{ubicar(d, 'mes_fondo_reserva')}_label")
+        )
+        mes_seleccionado = seleccionar_opcion(driver, ubicar(driver, "mes_fondo_reserva"), mes)
+        print(f"✅ Mes FR confirmado: {mes_seleccionado}")
+        anio_seleccionado = seleccionar_opcion(driver, ubicar(driver, "anio_fondo_reserva"), anio)
+        print(f"✅ Año FR confirmado: {anio_seleccionado}")
 
-            # --- Ingresar valor del Fondo de Reserva ---
-            input_valor_fr = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.ID, "frmLegal:j_idt600:0:j_idt607"))
-            )
-            driver.execute_script("""
-                arguments[0].value = arguments[1];
-                arguments[0].dispatchEvent(new Event('input'));
-                arguments[0].dispatchEvent(new Event('change'));
-            """, input_valor_fr, valor_fr)
-            print(f"✅ Fondo de Reserva procesado: {valor_fr}")
+        # --- Ingresar valor del Fondo de Reserva ---
+        llenar_seccion(driver, "fondo_reserva", {"Valor FR": valor_fr})
+        print(f"✅ Fondo de Reserva procesado: {valor_fr}")
 
-        else:
-            # --- Seleccionar radio 'No' vía JS ---
-            radio_no = driver.find_element(By.ID, "frmLegal:j_idt590:1")
-            driver.execute_script("arguments[0].checked = true; arguments[0].dispatchEvent(new Event('change'));", radio_no)
-            print("✅ Fondo de Reserva: No aplica")
-
-
-    # --- Décima Tercera ---
-    def procesar_xiii(driver, xiii, fecha_xiii, obs_xiii, total_rem_pendiente):
-
-        def formatear_fecha_xiii(fecha):
-            if pd.isna(fecha) or fecha == "":
-                return None
-            if isinstance(fecha, str) and fecha.isdigit():
-                return datetime.datetime(1899, 12, 30) + datetime.timedelta(days=int(fecha))
-            fecha_dt = pd.to_datetime(fecha, errors="coerce")
-            if pd.isna(fecha_dt):
-                raise ValueError(f"❌ No se pudo interpretar la fecha: {fecha}")
-            return fecha_dt
-
-        xiii_flag = xiii.strip().lower() == "si"
-
-        # --- Selección de radio con JS ---
-        radio_id = "frmLegal:j_idt616:0" if xiii_flag else "frmLegal:j_idt616:1"
-        radio_otra = "frmLegal:j_idt616:1" if xiii_flag else "frmLegal:j_idt616:0"
-
-        driver.execute_script(f"""
-            var radio = document.getElementById('{radio_id}');
-            radio.checked = true;
-            radio.dispatchEvent(new Event('change'));
-            var parentDiv = radio.closest('.ui-radiobutton');
-            parentDiv.classList.add('ui-state-active');
-            parentDiv.querySelector('.ui-radiobutton-icon').classList.remove('ui-icon-blank');
-            parentDiv.querySelector('.ui-radiobutton-icon').classList.add('ui-icon-bullet');
-            var otra = document.getElementById('{radio_otra}').closest('.ui-radiobutton');
-            otra.classList.remove('ui-state-active');
-            otra.querySelector('.ui-radiobutton-icon').classList.remove('ui-icon-bullet');
-            otra.querySelector('.ui-radiobutton-icon').classList.add('ui-icon-blank');
-        """)
-
-        if xiii_flag:
-            # Esperar que la tabla de Décima Tercera cargue
-            WebDriverWait(driver, 10).until(
-                lambda d: len(d.find_element(By.ID, "frmLegal:dgrDCR0003").find_elements(By.CSS_SELECTOR, "*")) > 0
-            )
+    else:
+        # --- Seleccionar radio 'No' vía JS ---
+        radio_no = driver.find_element(By.ID, f"{ubicar(driver, 'fondo_reserva')}:1")
+        driver.execute_script("arguments[0].checked = true; arguments[0].dispatchEvent(new Event('change'));", radio_no)
+        print("✅ Fondo de Reserva: No aplica")
+
+
+# --- Décima Tercera ---
+def procesar_xiii(driver, xiii, fecha_xiii, obs_xiii, total_rem_pendiente, esperado=None):
+
+    def formatear_fecha_xiii(fecha):
+        if pd.isna(fecha) or fecha == "":
+            return None
+        if isinstance(fecha, str) and fecha.isdigit():
+            return datetime.datetime(1899, 12, 30) + datetime.timedelta(days=int(fecha))
+        fecha_dt = pd.to_datetime(fecha, errors="coerce")
+        if pd.isna(fecha_dt):
+            raise ValueError(f"❌ No se pudo interpretar la fecha: {fecha}")
+        return fecha_dt
+
+    xiii_flag = xiii.strip().lower() == "si"
+
+    # --- Selección de radio con JS ---
+    grupo_xiii = ubicar(driver, "decimo_tercero")
+    radio_id = f"{grupo_xiii}:0" if xiii_flag else f"{grupo_xiii}:1"
+    radio_otra = f"{grupo_xiii}:1" if xiii_flag else f"{grupo_xiii}:0"
+
+    driver.execute_script(f"""
+        var radio = document.getElementById('{radio_id}');
+        radio.checked = true;
+        radio.dispatchEvent(new Event('change'));
+        var parentDiv = radio.closest('.ui-radiobutton');
+        parentDiv.classList.add('ui-state-active');
+        parentDiv.querySelector('.ui-radiobutton-icon').classList.remove('ui-icon-blank');
+        parentDiv.querySelector('.ui-radiobutton-icon').classList.add('ui-icon-bullet');
+        var otra = document.getElementById('{radio_otra}').closest('.ui-radiobutton');
+        otra.classList.remove('ui-state-active');
+        otra.querySelector('.ui-radiobutton-icon').classList.remove('ui-icon-bullet');
+        otra.querySelector('.ui-radiobutton-icon').classList.add('ui-icon-blank');
+    """)
+
+    if xiii_flag:
+        # Esperar que la tabla de Décima Tercera cargue
+        WebDriverWait(driver, 10).until(
+            lambda d: len(d.find_element(By.ID, "frmLegal:dgrDCR0003").find_elements(By.CSS_SELECTOR, "*")) > 0
+        )
 
-            # --- Manejo de fecha ---
-            if fecha_xiii:
-                fecha_dt = formatear_fecha_xiii(fecha_xiii)
-                if fecha_dt:
-                    calendar_icon = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, "#frmLegal\\:fechaInicioD3_input + button.ui-datepicker-trigger")
-                        )
-                    )
-                    calendar_icon.click()
-                    WebDriverWait(driver, 5).until(
-                        EC.visibility_of_element_located((By.ID, "ui-datepicker-div"))
+        # --- Manejo de fecha ---
+        if fecha_xiii:
+            fecha_dt = formatear_fecha_xiii(fecha_xiii)
+            if fecha_dt:
+                calendar_icon = WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable(
+                        (By.CSS_SELECTOR, "#frmLegal\\:fechaInicioD3_input + button.ui-datepicker-trigger")
                     )
+                )
+                calendar_icon.click()
+                WebDriverWait(driver, 5).until(
+                    EC.visibility_of_element_located((By.ID, "ui-datepicker-div"))
+                )
 
-                    # Seleccionar año
-                    year_select = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "ui-datepicker-year"))
-                    )
-                    year_select.send_keys(str(fecha_dt.year))
+                # Seleccionar año
+                year_select = WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "ui-datepicker-year"))
+                )
+                year_select.send_keys(str(fecha_dt.year))
 
-                    # Seleccionar mes
-                    month_select = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "ui-datepicker-month"))
-                    )
-                    month_select.send_keys(fecha_dt.strftime("%b"))
-
-                    # Seleccionar día
-                    mes_attr = fecha_dt.month - 1
-                    year_attr = fecha_dt.year
-                    dia = fecha_dt.day
-                    day_xpath = f"//td[@data-handler='selectDay' and @data-month='{mes_attr}' and @data-year='{year_attr}']/a[text()='{dia}']"
-
-                    WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, day_xpath))
-                    ).click()
-
-                    print(f"✅ Fecha Décima Tercera establecida: {fecha_dt.strftime('%d/%m/%Y')}")
-
-            # --- Manejo de observación ---
-            if obs_xiii:
-                safe_send_keys(driver, "frmLegal:j_idt626", obs_xiii)
-                print(f"✅ Observación Décima Tercera: {obs_xiii}")
-                
-        # --- Registrar Total Remuneración pendiente en Agosto 2025 ---
-        if total_rem_pendiente and str(total_rem_pendiente).strip() not in ["", "0", "0.0"]:
-            try:
-                # Presionar botón para habilitar campo
-                boton_agregar = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, "frmLegal:j_idt1053"))
+                # Seleccionar mes
+                month_select = WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "ui-datepicker-month"))
                 )
-                boton_agregar.click()
-                print("✅ Botón 'Registrar Ingreso' presionado para habilitar el campo")
+                month_select.send_keys(fecha_dt.strftime("%b"))
+
+                # Seleccionar día
+                mes_attr = fecha_dt.month - 1
+                year_attr = fecha_dt.year
+                dia = fecha_dt.day
+                day_xpath = f"//td[@data-handler='selectDay' and @data-month='{mes_attr}' and @data-year='{year_attr}']/a[text()='{dia}']"
 
-                # Esperar panel listo
                 WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.ID, "frmLegal:pnlIngreso0003"))
-                )
+                    EC.element_to_be_clickable((By.XPATH, day_xpath))
+                ).click()
+
+                print(f"✅ Fecha Décima Tercera establecida: {fecha_dt.strftime('%d/%m/%Y')}")
+
+        # --- Manejo de observación ---
+        if obs_xiii:
+            safe_send_keys(driver, ubicar(driver, "obs_decimo_tercero"), obs_xiii)
+            print(f"✅ Observación Décima Tercera: {obs_xiii}")
+            
+    # --- Registrar Total Remuneración pendiente en Agosto 2025 ---
+    if total_rem_pendiente and str(total_rem_pendiente).strip() not in ["", "0", "0.0"]:
+        try:
+            # Presionar botón para habilitar campo
+            boton_agregar = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.ID, ubicar(driver, "registrar_ingreso")))
+            )
+            boton_agregar.click()
+            print("✅ Botón 'Registrar Ingreso' presionado para habilitar el campo")
 
-                intentos = 5
-                for i in range(intentos):
-                    # Pegar valor vía JS
-                    driver.execute_script("""
-                        var input = document.getElementById('frmLegal:txtSueldo20257');
-                        input.value = arguments[0];
-                        input.dispatchEvent(new Event('input', { bubbles: true }));
-                        input.dispatchEvent(new Event('change', { bubbles: true }));
-                        if (typeof PrimeFaces !== 'undefined') {
-                            PrimeFaces.ab({
-                                s: input.id,
-                                e: 'change',
-                                f: 'frmLegal',
-                                p: input.id,
-                                u: 'frmLegal:pnlIngreso0003',
-                                ps: true
-                            });
-                        }
-                    """, str(total_rem_pendiente))
-
-                    # Esperar 0.5s para que el cálculo ocurra
-                    time.sleep(0.5)
-
-                    # Verificar si el campo calculado ya cambió
-                    valor_calculado = driver.execute_script(
-                        "return document.getElementById('frmLegal:txtSueldoDecimo00001').value;"
-                    )
-                    if valor_calculado != "0" and valor_calculado.strip() != "":
-                        print(f"✅ Total Remuneración Pendiente registrada y calculada: {valor_calculado}")
-                        break
-                    else:
-                        print(f"⚠️ Intento {i+1}/{intentos}: campo calculado aún en 0, reintentando...")
-                else:
-                    print("❌ No se pudo registrar Total Remuneración Pendiente después de varios intentos")
+            # Esperar panel listo
+            WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.ID, "frmLegal:pnlIngreso0003"))
+            )
 
-            except Exception as e:
-                print(f"❌ Error registrando salario pendiente desde Excel: {e}")
- 
-     # --- Uso dentro del flujo principal ---
-    #agregar_remuneracion(driver, salario_pendiente, mes, anio, sueldo_nominal,
-                        #horas_suplementarias, horas_extraordinarias, horas_nocturnas)       
+            # Se espera el valor exacto calculado localmente; si el SUT muestra otro
+            # monto la fila se detiene antes de enviarse
+            visto = {"valor": None}
+            def _decimo_calculado(d):
+                visto["valor"] = calculo.a_monto(d.execute_script(
+                    "return document.getElementById('frmLegal:txtSueldoDecimo00001').value;"
+                ))
+                if esperado is None or pd.isna(esperado):
+                    return visto["valor"] or False
+                return visto["valor"] if calculo.coincide(visto["valor"], esperado) else False
+
+            def _registrar():
+                # Pegar valor vía JS y esperar a que el panel se recalcule
+                ejecutar_y_esperar(driver, "frmLegal:pnlIngreso0003", lambda: driver.execute_script("""
+                    var input = document.getElementById('frmLegal:txtSueldo20257');
+                    input.value = arguments[0];
+                    input.dispatchEvent(new Event('input', { bubbles: true }));
+                    input.dispatchEvent(new Event('change', { bubbles: true }));
+                    if (typeof PrimeFaces !== 'undefined') {
+                        PrimeFaces.ab({
+                            s: input.id,
+                            e: 'change',
+                            f: 'frmLegal',
+                            p: input.id,
+                            u: 'frmLegal:pnlIngreso0003',
+                            ps: true
+                        });
+                    }
+                """, str(total_rem_pendiente)))
+                try:
+                    return WebDriverWait(driver, 2, poll_frequency=POLL_AJAX).until(_decimo_calculado)
+                except TimeoutException:
+                    if visto["valor"]:
+                        calculo.verificar_xiii(visto["valor"], esperado)
+                    raise TimeoutException("campo calculado aún en 0")
+
+            valor_calculado = reintentos.ejecutar("decimo_tercero", _registrar)
+            print(f"✅ Total Remuneración Pendiente registrada y calculada: {valor_calculado:.2f}")
+
+        except calculo.DiferenciaCalculo:
+            raise
+        except Exception as e:
+            print(f"❌ Error registrando salario pendiente desde Excel: {e}")
 
-    procesar_fondo_reserva(driver, fondo_reserva, valor_fr)
+# --- Procesar una fila del Excel ---
+def procesar_fila(driver, row):
+    identificacion = row['Identificacion']
+    fecha_salida = row['Fecha de Salida'] if 'Fecha de Salida' in row else ''
+    remuneracion = row['Remuneracion']
+    causa = row['Causa']
+    mes = row['Mes']
+    anio = row['Año']
+    salario_pendiente = row['Salario_pendiente']
+    sueldo_nominal = row['Sueldo_nominal']
+    horas_suplementarias = row['Horas_suplementarias']
+    horas_extraordinarias = row['Horas_extraordinarias']
+    horas_nocturnas = row['Horas_nocturnas']
+    cumplimiento_laboral = row['Cumplimiento_laboral']
+    comision_por_responsabilidad = row['Comision_por_responsabilidad']
+    total_rem_pendiente = row['Total_remuneracion_pendiente']
+    fondo_reserva = row['Fondo de reserva'].strip().lower()
+    valor_fr = row['Valor FR']
+    xiii = row['XIII'].strip().lower()
+    fecha_xiii = row['Fecha XIII'] if 'Fecha XIII' in row else ''
+    obs_xiii = row['Obs XIII'] if 'Obs XIII' in row else ''
 
-    procesar_xiii(driver, xiii, fecha_xiii, obs_xiii, total_rem_pendiente)
+    with tramo("pasos_criticos"):
+        pasos_criticos(driver, identificacion)
 
-    # --- Marcar fila como enviada ---
-    df_datos.at[fila.index[0], 'Enviado'] = "Sí"
-    df_datos.to_excel(r"autofill_sut\datos.xlsx", index=False)
-    print(f"✅ Registro con Identificación {identificacion} procesado")
+    # --- Rellenar remuneración principal ---
+    with tramo("remuneracion"):
+        llenar_seccion(driver, "remuneracion", row)
+
+    with tramo("seleccionar_causa"):
+        seleccionar_causa(driver, causa)
+
+    # --- Uso dentro del flujo principal ---
+    with tramo("agregar_remuneracion"):
+        agregar_remuneracion(driver, salario_pendiente, mes, anio, sueldo_nominal,
+                             horas_suplementarias, horas_extraordinarias, horas_nocturnas)
+
+    with tramo("procesar_fondo_reserva"):
+        procesar_fondo_reserva(driver, fondo_reserva, valor_fr, mes, anio)
+
+    with tramo("procesar_xiii"):
+        procesar_xiii(driver, xiii, fecha_xiii, obs_xiii, total_rem_pendiente,
+                      float(calculo.decimo_tercero(total_rem_pendiente)))
+
+# --- Resumen de rendimiento ---
+def imprimir_resumen(duraciones, total_s, procesadas, fallidas, salud=None):
+    resumen = {
+        "procesadas": procesadas,
+        "fallidas": fallidas,
+        "total_s": round(total_s, 3),
+        "filas_min": round((procesadas / total_s * 60) if total_s > 0 else 0.0, 3),
+        "p50_s": round(percentil(duraciones, 50), 3),
+        "p95_s": round(percentil(duraciones, 95), 3),
+    }
+    print("📊 Resumen del lote")
+    print(f"   Filas procesadas: {procesadas} | fallidas: {fallidas} | tiempo total: {total_s:.1f} s")
+    print(f"   Rendimiento: {resumen['filas_min']:.2f} filas/min")
+    print(f"   Por fila: p50 {resumen['p50_s']:.2f} s | p95 {resumen['p95_s']:.2f} s")
+    if trazas.actual() is not None:
+        trazas.actual().imprimir_resumen()
+    reintentos.imprimir_estadisticas()
+    if salud is not None:
+        salud.imprimir_resumen()
+    return resumen
+
+# --- Modo lote: todas las filas pendientes en una sola sesión ---
+def _filas_pendientes(df_datos, bitacora, limite=None):
+    # df_datos puede ser un DataFrame o un iterable de bloques (entrada.leer_bloques);
+    # con bloques, cada uno se filtra contra la bitácora recién cuando se necesita.
+    bloques = [df_datos] if isinstance(df_datos, pd.DataFrame) else df_datos
+    filas = (fila for bloque in bloques for fila in bitacora.pendientes(bloque).iterrows())
+    return itertools.islice(filas, limite)
+
+def procesar_lote(driver, df_datos, bitacora, limite=None, url=URL_FORMULARIO, salud=None):
+    # Las filas pendientes salen de la bitácora, no de la columna Enviado
+    traza = trazas.actual() or trazas.activar(trazas.Traza())
+    duraciones = []
+    procesadas = fallidas = 0
+    inicio_lote = time.perf_counter()
+    for n, (indice, row) in enumerate(_filas_pendientes(df_datos, bitacora, limite)):
+        traza.iniciar_fila(row['Identificacion'])
+        inicio_fila = time.perf_counter()
+        error = None
+        try:
+            with tramo("fila"):
+                if n > 0:
+                    with tramo("volver_a_busqueda"):
+                        volver_a_busqueda(driver, url=url)
+                procesar_fila(driver, row)
+        except Exception as e:
+            error = str(e)
+        duraciones.append(time.perf_counter() - inicio_fila)
+
+        # --- Marcar fila como enviada (o con error) ---
+        with tramo("escritura"):
+            bitacora.registrar(row['Identificacion'], bitacora_mod.ERROR if error else bitacora_mod.ENVIADO, error)
+        traza.cerrar_fila()
+        if error:
+            fallidas += 1
+            print(f"❌ Error procesando identificación {row['Identificacion']}: {error}")
+        else:
+            procesadas += 1
+            print(f"✅ Registro con Identificación {row['Identificacion']} procesado")
 
-df_datos.info()
+        if salud is not None:
+            # Después de registrar la fila: si el reciclaje falla, la fila ya
+            # consta en la bitácora. Puede devolver otra pestaña u otra sesión.
+            try:
+                driver = salud.despues_de_fila(driver, duraciones[-1])
+            except Exception as e:
+                print(f"❌ No se pudo recuperar el navegador, se detiene el lote: {e}")
+                break
 
-driver.quit()
\ No newline at end of file
+    if not duraciones:
+        print("❌ No hay registros pendientes para procesar")
+        return
+    return imprimir_resumen(duraciones, time.perf_counter() - inicio_lote, procesadas, fallidas, salud)
+
+# --- Modo lote con el motor HTTP (sin navegador) ---
+def procesar_lote_http(df_datos, bitacora, sesiones, hilos=8, limite=None, url=URL_FORMULARIO):
+    import http_sut
+    pendientes = bitacora.pendientes(df_datos).drop_duplicates(subset='Identificacion', keep='first')
+    if limite is not None:
+        pendientes = pendientes.head(limite)
+    if pendientes.empty:
+        print("❌ No hay registros pendientes para procesar")
+        return
+
+    duraciones = []
+    procesadas = fallidas = 0
+    inicio_lote = time.perf_counter()
+    registros = pendientes.to_dict("records")
+    for identificacion, error, duracion in http_sut.procesar_concurrente(registros, sesiones, url, hilos):
+        duraciones.append(duracion)
+        if error:
+            fallidas += 1
+            bitacora.registrar(identificacion, bitacora_mod.ERROR, error)
+            print(f"❌ Error procesando identificación {identificacion}: {error}")
+            continue
+        bitacora.registrar(identificacion, bitacora_mod.ENVIADO)
+        procesadas += 1
+        print(f"✅ Registro con Identificación {identificacion} procesado (HTTP)")
+
+    return imprimir_resumen(duraciones, time.perf_counter() - inicio_lote, procesadas, fallidas)
+
+def leer_datos(ruta_datos=RUTA_DATOS):
+    return entrada.leer_todo(ruta_datos)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Llenado automático del acta de finiquito en el SUT")
+    parser.add_argument("--datos", default=RUTA_DATOS, help="Ruta del Excel con los registros")
+    parser.add_argument("--debugger", default=DEBUGGER_ADDRESS, help="Dirección de depuración de Chrome")
+    parser.add_argument("--lote", action="store_true", help="Procesar todas las filas pendientes")
+    parser.add_argument("--limit", type=int, default=None, help="Procesar como máximo N filas pendientes")
+    parser.add_argument("--puertos", default=None,
+                        help="Puertos de depuración separados por coma para trabajar en paralelo (ej. 9222,9223)")
+    parser.add_argument("--perfiles", default=None,
+                        help="Directorio base de perfiles: lanza un Chrome por puerto con su propio perfil")
+    parser.add_argument("--chrome", default="chrome", help="Ejecutable de Chrome usado con --perfiles")
+    parser.add_argument("--bitacora", default=RUTA_BITACORA, help="Bitácora SQLite con el avance por identificación")
+    parser.add_argument("--exportar", action="store_true",
+                        help="Solo actualizar la columna Enviado de --datos desde la bitácora (mismo formato)")
+    parser.add_argument("--bloque", type=int, default=None,
+                        help="Leer --datos por bloques de N filas sin cargarlo completo (xlsx, csv, parquet)")
+    parser.add_argument("--rechazos", default=RUTA_RECHAZOS, help="CSV con las filas rechazadas en la validación")
+    parser.add_argument("--esperados", default=None,
+                        help="Guardar en CSV la Décima Tercera y el Fondo de Reserva calculados por fila")
+    parser.add_argument("--causas", default=None,
+                        help="Números de causa que existen en el SUT, separados por coma (ej. 1,2,5)")
+    parser.add_argument("--localizadores", default=localizadores.RUTA_LOCALIZADORES,
+                        help="Caché en disco de los ids resueltos del formulario")
+    parser.add_argument("--politica", default=None,
+                        help="JSON con la política de reintentos por paso y el interruptor (ver reintentos.py)")
+    salud_mod.agregar_opciones(parser)
+    parser.add_argument("--trazas", default=None,
+                        help="Exportar los tiempos por paso y fila a un archivo .jsonl o .csv")
+    parser.add_argument("--motor", choices=["navegador", "http"], default="navegador",
+                        help="navegador (Selenium) o http (peticiones parciales JSF directas, sin navegador)")
+    parser.add_argument("--url", default=URL_FORMULARIO,
+                        help="URL del formulario (ej. un SUT local de pruebas, ver mock_sut.py)")
+    parser.add_argument("--cookie", action="append", default=[],
+                        help="Cookie de sesión para el motor HTTP, NOMBRE=VALOR (ej. JSESSIONID=...)")
+    parser.add_argument("--sesion", action="append", default=[],
+                        help="Cookies de una sesión del SUT, NOMBRE=VALOR;NOMBRE=VALOR (repetir, una por hilo)")
+    parser.add_argument("--hilos", type=int, default=8,
+                        help="Sesiones HTTP concurrentes del motor HTTP (como máximo una por sesión del SUT)")
+    args = parser.parse_args(argv)
+
+    # Sin --lote ni --limit se mantiene el comportamiento original: una sola fila
+    limite = args.limit if (args.lote or args.limit is not None) else 1
+
+    bitacora = Bitacora(args.bitacora)
+    traza = trazas.activar(trazas.Traza(args.trazas))
+    if args.politica:
+        reintentos.configurar(args.politica)
+    localizadores.activar(localizadores.IndiceLocalizadores(args.localizadores))
+    causas = [c.strip() for c in args.causas.split(",")] if args.causas else None
+    limites = salud_mod.limites(args)
+    # CSV/Parquet (o --bloque) se leen en streaming: solo las columnas del flujo y
+    # sin las filas ya marcadas Enviado; el archivo de entrada no se reescribe.
+    bloque = args.bloque or (None if args.datos.lower().endswith((".xlsx", ".xlsm")) else entrada.TAMANIO_BLOQUE)
+    if args.exportar:
+        df_datos = leer_datos(args.datos)
+        bitacora.importar_enviados(df_datos)
+        bitacora.exportar(df_datos, args.datos)
+        bitacora.cerrar()
+        return
+
+    df_datos = None
+    totales = None
+    if bloque:
+        lista_rechazos = []
+        limpios = entrada.validar_bloques(entrada.leer_bloques(args.datos, bloque), causas, lista_rechazos)
+        if args.esperados:
+            # El CSV por fila necesita una primera pasada completa; los totales
+            # salen antes de abrir el navegador, igual que con el Excel completo
+            calculo.imprimir_totales(calculo.calcular_bloques(
+                entrada.validar_bloques(entrada.leer_bloques(args.datos, bloque), causas), args.esperados
+            ))
+            print(f"💾 Valores esperados por fila guardados en {args.esperados}")
+        else:
+            # Sin CSV no se relee el archivo: los totales se suman en la misma
+            # pasada del lote y se imprimen al final
+            totales = {}
+            limpios = calculo.sumar_totales(limpios, totales)
+        if args.motor == "http" or args.puertos:
+            # Estos motores reparten filas por adelantado: se juntan solo las pendientes
+            pendientes = [bitacora.pendientes(b) for b in limpios]
+            limpios = pd.concat(pendientes) if pendientes else pd.DataFrame(columns=entrada.COLUMNAS)
+    else:
+        df_datos = leer_datos(args.datos)
+        bitacora.importar_enviados(df_datos)
+
+        # --- Validación previa: solo las filas limpias llegan al navegador ---
+        limpios, rechazos = validar(df_datos, causas)
+        if not rechazos.empty:
+            guardar_rechazos(rechazos, args.rechazos)
+        esperados = calculo.calcular(limpios)
+        calculo.imprimir_totales(esperados)
+        if args.esperados:
+            esperados.to_csv(args.esperados, index=False, encoding="utf-8-sig")
+            print(f"💾 Valores esperados por fila guardados en {args.esperados}")
+
+    try:
+        if args.motor == "http":
+            # Una sesión del SUT por hilo: --sesion repetida, o una sola con --cookie
+            sesiones = [dict(c.strip().split("=", 1) for c in sesion.split(";") if c.strip())
+                        for sesion in args.sesion]
+            if not sesiones and args.cookie:
+                sesiones = [dict(c.split("=", 1) for c in args.cookie)]
+            procesar_lote_http(limpios, bitacora, sesiones, args.hilos, limite, args.url)
+        elif args.puertos:
+            import paralelo
+            puertos = [int(p) for p in args.puertos.split(",") if p.strip()]
+            navegadores = []
+            if args.perfiles:
+                navegadores = [
+                    paralelo.lanzar_chrome(puerto, os.path.join(args.perfiles, f"perfil_{puerto}"), args.chrome)
+                    for puerto in puertos
+                ]
+                for puerto in puertos:
+                    paralelo.esperar_chrome(puerto)
+            try:
+                paralelo.procesar_en_paralelo(limpios, puertos, bitacora, limite, traza, args.url,
+                                              args.politica, args.localizadores, limites)
+            finally:
+                for navegador in navegadores:
+                    navegador.terminate()
+        else:
+            def _conectar():
+                return traza.instrumentar(conectar_driver(args.debugger))
+            salud = salud_mod.MonitorSalud(_conectar, lambda d: cargar_formulario(d, args.url), **limites)
+            driver = _conectar()
+            try:
+                cargar_formulario(driver, args.url)
+                procesar_lote(driver, limpios, bitacora, limite, args.url, salud)
+            finally:
+                (salud.driver or driver).quit()
+    finally:
+        if df_datos is not None:
+            # El Excel se escribe una sola vez al final, también si el lote se interrumpe
+            bitacora.exportar(df_datos, args.datos)
+        else:
+            if lista_rechazos:
+                guardar_rechazos(pd.concat(lista_rechazos), args.rechazos)
+            if totales is not None:
+                calculo.imprimir_totales(totales, "Valores esperados de los bloques leídos")
+            print("ℹ️ Lectura en streaming: el avance queda en la bitácora (usar --exportar para actualizar --datos)")
+        bitacora.cerrar()
+    if df_datos is not None:
+        df_datos.info()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+
+import pandas as pd
+
+import autofill
+import calculo
+import mock_sut
+import reintentos
+import trazas
+from bitacora import Bitacora
+from validacion import validar
+
+# --- Filas sintéticas con el mismo formato que datos.xlsx ---
+def filas_sinteticas(n, semilla=0):
+    azar = random.Random(semilla)
+    filas = []
+    for i in range(n):
+        fondo_reserva = azar.choice(["si", "no"])
+        xiii = azar.choice(["si", "no"])
+        remuneracion = round(azar.uniform(470, 2500), 2)
+        filas.append({
+            "Identificacion": f"{1700000000 + i:010d}",
+            "Remuneracion": f"{remuneracion:.2f}",
+            "Causa": azar.choice(list(mock_sut.CAUSAS)),
+            "Mes": azar.choice(mock_sut.MESES),
+            "Año": "2025",
+            "Salario_pendiente": azar.choice(["0", f"{azar.uniform(50, 800):.2f}"]),
+            "Sueldo_nominal": f"{azar.uniform(470, 2500):.2f}",
+            "Horas_suplementarias": str(azar.randint(0, 10)),
+            "Horas_extraordinarias": str(azar.randint(0, 10)),
+            "Horas_nocturnas": str(azar.randint(0, 10)),
+            "Cumplimiento_laboral": "0",
+            "Comision_por_responsabilidad": "0",
+            "Total_remuneracion_pendiente": f"{azar.uniform(0, 6000):.2f}" if xiii == "si" else "0",
+            "Fondo de reserva": fondo_reserva,
+            "Valor FR": f"{float(calculo.fondo_reserva(remuneracion)):.2f}" if fondo_reserva == "si" else "",
+            "XIII": xiii,
+            "Fecha XIII": f"{azar.randint(1, 28):02d}/{azar.randint(1, 12):02d}/2024" if xiii == "si" else "",
+            "Obs XIII": "",
+            "Enviado": "",
+        })
+    return pd.DataFrame(filas)
+
+def _conectar(debugger, headless):
+    if debugger:
+        return autofill.conectar_driver(debugger)
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    return webdriver.Chrome(options=options)
+
+# --- Ejecución del benchmark ---
+def ejecutar(filas=20, latencia=0.2, jitter=0.1, motor="navegador", debugger=None, headless=True,
+             hilos=8, semilla=0):
+    servidor, url = mock_sut.iniciar_servidor(0, latencia, jitter)
+    print(f"🧪 SUT local en {url} (latencia {latencia}s ± {jitter}s)")
+    try:
+        limpios, rechazos = validar(filas_sinteticas(filas, semilla))
+        bitacora = Bitacora(":memory:")
+        traza = trazas.activar(trazas.Traza())
+        if motor == "http":
+            resumen = autofill.procesar_lote_http(limpios, bitacora, [], hilos, url=url)
+        else:
+            driver = traza.instrumentar(_conectar(debugger, headless))
+            try:
+                autofill.cargar_formulario(driver, url)
+                resumen = autofill.procesar_lote(driver, limpios, bitacora, url=url)
+            finally:
+                driver.quit()
+        resumen = dict(resumen or {})
+        resumen.update({
+            "motor": motor,
+            "filas": filas,
+            "rechazadas": len(rechazos),
+            "latencia": latencia,
+            "jitter": jitter,
+            "pasos": traza.resumen(),
+            "reintentos": reintentos.estadisticas(),
+        })
+        return resumen
+    finally:
+        servidor.shutdown()
+
+def comparar(actual, base, tolerancia=10.0):
+    # Regresión si las filas/min caen más de `tolerancia` % respecto a la base
+    if not base.get("filas_min"):
+        return True
+    caida = (base["filas_min"] - actual["filas_min"]) / base["filas_min"] * 100
+    print(f"📈 Filas/min: base {base['filas_min']:.2f} -> actual {actual['filas_min']:.2f} ({-caida:+.1f} %)")
+    for paso, r in actual.get("pasos", {}).items():
+        anterior = base.get("pasos", {}).get(paso)
+        if anterior and anterior["p95"] > 0:
+            print(f"   {paso:<24} p95 {anterior['p95']:.2f} -> {r['p95']:.2f} s")
+    return caida <= tolerancia
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de autofill.py contra el SUT local")
+    parser.add_argument("--filas", type=int, default=20, help="Número de filas sintéticas")
+    parser.add_argument("--latencia", type=float, default=0.2, help="Latencia del servidor por petición (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Variación aleatoria de la latencia (± s)")
+    parser.add_argument("--motor", choices=["navegador", "http"], default="navegador")
+    parser.add_argument("--debugger", default=None,
+                        help="Conectarse a un Chrome ya abierto (ej. 127.0.0.1:9222); si no, se lanza uno nuevo")
+    parser.add_argument("--con-ventana", action="store_true", help="No usar modo headless al lanzar Chrome")
+    parser.add_argument("--hilos", type=int, default=8, help="Sesiones concurrentes del motor HTTP")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default=None, help="Guardar el resultado en JSON")
+    parser.add_argument("--comparar", default=None, help="JSON de un benchmark anterior para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=10.0,
+                        help="Caída máxima aceptada de filas/min respecto a --comparar (%%)")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args.filas, args.latencia, args.jitter, args.motor, args.debugger,
+                         not args.con_ventana, args.hilos, args.semilla)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultado guardado en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if not comparar(resultado, base, args.tolerancia):
+            print(f"❌ Regresión de rendimiento mayor a {args.tolerancia} %")
+            raise SystemExit(1)
+        print("✅ Sin regresión de rendimiento")
+
+if __name__ == "__main__":
+    main()
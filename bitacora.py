@@ -0,0 +1,94 @@
+import datetime
+import sqlite3
+
+import entrada
+
+ENVIADO = "enviado"
+ERROR = "error"
+
+# --- Bitácora de avance: una fila por identificación con su último estado ---
+class Bitacora:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        # WAL: cada registro queda en disco sin reescribir el archivo completo
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("""
+            CREATE TABLE IF NOT EXISTS registros (
+                identificacion TEXT PRIMARY KEY,
+                estado TEXT NOT NULL,
+                actualizado TEXT NOT NULL,
+                intentos INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            )
+        """)
+        self.conexion.commit()
+
+    def registrar(self, identificacion, estado, error=None):
+        # Cada llamada es un intento real: reemplaza estado y error y suma un intento
+        ahora = datetime.datetime.now().isoformat(timespec="seconds")
+        with self.conexion:
+            self.conexion.execute("""
+                INSERT INTO registros (identificacion, estado, actualizado, intentos, error)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(identificacion) DO UPDATE SET
+                    estado = excluded.estado,
+                    actualizado = excluded.actualizado,
+                    intentos = registros.intentos + 1,
+                    error = excluded.error
+            """, (str(identificacion), estado, ahora, error))
+
+    def enviados(self):
+        cursor = self.conexion.execute(
+            "SELECT identificacion FROM registros WHERE estado = ?", (ENVIADO,)
+        )
+        return {fila[0] for fila in cursor}
+
+    def estados(self):
+        cursor = self.conexion.execute(
+            "SELECT identificacion, estado, actualizado, intentos, error FROM registros"
+        )
+        return {
+            fila[0]: {"estado": fila[1], "actualizado": fila[2], "intentos": fila[3], "error": fila[4]}
+            for fila in cursor
+        }
+
+    def fijar_estado(self, identificaciones, estado, error=None):
+        # Corrige el estado sin que cuente como intento (migraciones, conciliación)
+        ahora = datetime.datetime.now().isoformat(timespec="seconds")
+        with self.conexion:
+            self.conexion.executemany("""
+                INSERT INTO registros (identificacion, estado, actualizado, intentos, error)
+                VALUES (?, ?, ?, 0, ?)
+                ON CONFLICT(identificacion) DO UPDATE SET
+                    estado = excluded.estado,
+                    actualizado = excluded.actualizado,
+                    error = excluded.error
+            """, [(str(i), estado, ahora, error) for i in identificaciones])
+
+    def importar_enviados(self, df_datos):
+        # Migración: las filas marcadas "Sí" por versiones anteriores del script
+        # pasan a la bitácora para no volver a enviarlas. Si la identificación ya
+        # tiene registro manda la bitácora (ej. un error puesto por la conciliación).
+        registradas = set(self.estados())
+        marcados = df_datos.loc[df_datos['Enviado'] == "Sí", 'Identificacion'].astype(str)
+        self.fijar_estado(marcados[~marcados.isin(registradas)], ENVIADO)
+
+    def pendientes(self, df_datos):
+        return df_datos[~df_datos['Identificacion'].astype(str).isin(self.enviados())]
+
+    def aplicar_a(self, df_datos):
+        # La columna Enviado se deriva de la bitácora: las identificaciones con
+        # error vuelven a quedar pendientes aunque el archivo dijera "Sí"
+        estados = {i: r["estado"] for i, r in self.estados().items()}
+        estado = df_datos['Identificacion'].astype(str).map(estados)
+        df_datos.loc[estado == ENVIADO, 'Enviado'] = "Sí"
+        df_datos.loc[estado == ERROR, 'Enviado'] = ""
+        return df_datos
+
+    def exportar(self, df_datos, ruta_datos):
+        entrada.escribir_todo(self.aplicar_a(df_datos), ruta_datos)
+        print(f"💾 Columna Enviado actualizada desde la bitácora: {ruta_datos}")
+
+    def cerrar(self):
+        self.conexion.close()
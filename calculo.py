@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from validacion import a_numero
+
+# --- Reglas de cálculo ---
+# Décima tercera: el SUT divide el total de remuneraciones pendientes para 12.
+# Fondo de reserva: 8,33 % de la remuneración mensual.
+DIVISOR_XIII = 12
+TASA_FONDO_RESERVA = 0.0833
+TOLERANCIA = 0.01
+
+class DiferenciaCalculo(ValueError):
+    pass
+
+def _redondear(valor):
+    # Redondeo comercial a centavos (np.round redondea 0,5 al par)
+    return np.floor(np.asarray(valor, dtype=float) * 100 + 0.5) / 100
+
+def decimo_tercero(total_rem_pendiente):
+    # Acepta un escalar o una Serie; devuelve NaN donde no hay total que registrar
+    total = np.asarray(total_rem_pendiente, dtype=float)
+    return np.where(total > 0, _redondear(total / DIVISOR_XIII), np.nan)
+
+def fondo_reserva(remuneracion):
+    return _redondear(np.asarray(remuneracion, dtype=float) * TASA_FONDO_RESERVA)
+
+def a_monto(texto):
+    # Valor mostrado por el SUT ("1.234,56", "102.5", "") -> float o None
+    numero = a_numero(pd.Series([texto])).iloc[0]
+    return None if pd.isna(numero) else float(numero)
+
+def coincide(valor, esperado, tolerancia=TOLERANCIA):
+    # Se redondea la diferencia: 38.48 vs 38.49 da 0.01000000000000512 en float
+    return valor is not None and round(abs(valor - esperado), 2) <= tolerancia
+
+def verificar_xiii(valor, esperado, tolerancia=TOLERANCIA):
+    if not coincide(valor, esperado, tolerancia):
+        raise DiferenciaCalculo(
+            f"❌ Décima tercera del SUT ({valor}) no coincide con la calculada ({esperado:.2f})"
+        )
+
+# --- Cálculo del lote completo antes de abrir el navegador ---
+def calcular(df_limpio):
+    # df_limpio viene de validacion.validar (columnas ya numéricas)
+    resultado = pd.DataFrame(index=df_limpio.index)
+    resultado["Identificacion"] = df_limpio["Identificacion"]
+    resultado["XIII esperado"] = decimo_tercero(df_limpio["Total_remuneracion_pendiente"])
+    con_fr = df_limpio["Fondo de reserva"] == "si"
+    resultado["FR esperado"] = np.where(con_fr, fondo_reserva(df_limpio["Remuneracion"]), np.nan)
+    resultado["Valor FR"] = df_limpio["Valor FR"].where(con_fr)
+    resultado["Diferencia FR"] = (resultado["Valor FR"] - resultado["FR esperado"]).round(2)
+    return resultado
+
+def totales(calculado):
+    return {
+        "filas": len(calculado),
+        "con_xiii": int(calculado["XIII esperado"].notna().sum()),
+        "total_xiii": round(float(calculado["XIII esperado"].sum()), 2),
+        "con_fr": int(calculado["FR esperado"].notna().sum()),
+        "total_fr": round(float(calculado["FR esperado"].sum()), 2),
+        "fr_distinto": int((calculado["Diferencia FR"].abs() > TOLERANCIA).sum()),
+    }
+
+def sumar_totales(bloques, acumulado, ruta=None):
+    # Para la lectura en streaming: calcula cada bloque (de entrada.validar_bloques)
+    # mientras pasa, suma sus totales en acumulado y lo devuelve sin cambios; con
+    # ruta agrega además el CSV de valores esperados por partes
+    for n, bloque in enumerate(bloques):
+        calculado = calcular(bloque)
+        if ruta:
+            calculado.to_csv(ruta, mode="a" if n else "w", header=not n, index=False, encoding="utf-8-sig")
+        for clave, valor in totales(calculado).items():
+            acumulado[clave] = round(acumulado.get(clave, 0) + valor, 2)
+        yield bloque
+
+def calcular_bloques(bloques, ruta=None):
+    # Recorre todos los bloques solo para los totales (primera pasada con --esperados)
+    acumulado = {}
+    for _ in sumar_totales(bloques, acumulado, ruta):
+        pass
+    return acumulado
+
+def imprimir_totales(calculado, titulo="Valores esperados del lote"):
+    # Acepta el DataFrame de calcular o los totales ya sumados por bloques
+    t = calculado if isinstance(calculado, dict) else totales(calculado)
+    if not t:
+        return t
+    print(f"🧮 {titulo}")
+    print(f"   Décima tercera: {t['con_xiii']} filas | total {t['total_xiii']:.2f}")
+    print(f"   Fondo de reserva: {t['con_fr']} filas | total {t['total_fr']:.2f}")
+    if t["fr_distinto"]:
+        print(f"⚠️ {t['fr_distinto']} filas con Valor FR distinto al {TASA_FONDO_RESERVA:.2%} de la remuneración")
+    return t
@@ -0,0 +1,149 @@
+from selenium.webdriver.common.by import By
+
+import reintentos
+from esperas import esperar_ajax
+from localizadores import ubicar
+from validacion import a_texto
+
+# --- Estrategias de llenado ---
+VALOR = "valor"      # asigna value y dispara input/change
+TECLADO = "teclado"  # se escribe con teclas reales (send_keys) para campos con máscara u onkeyup
+
+# --- Mapa declarativo: columna del Excel -> componente del formulario ---
+# El componente puede ser un id o un nombre lógico de localizadores.LOCALIZADORES
+SECCIONES = {
+    "remuneracion": [
+        ("Remuneracion", "frmLegal:remuneracion", VALOR),
+    ],
+    "dialogo_remuneracion": [
+        ("Salario_pendiente", "frmLegal:txtDlg001", VALOR),
+        ("Sueldo_nominal", "frmLegal:txtDlg0012", VALOR),
+        ("Horas_suplementarias", "frmLegal:txtDlg002", TECLADO),
+        ("Horas_extraordinarias", "frmLegal:txtDlg004", TECLADO),
+        ("Horas_nocturnas", "frmLegal:txtDlg004n", TECLADO),
+    ],
+    "fondo_reserva": [
+        ("Valor FR", "valor_fondo_reserva", VALOR),
+    ],
+}
+
+# Un solo execute_script llena los campos VALOR de la sección y devuelve el resultado por campo
+_JS_LLENAR = """
+    var campos = arguments[0];
+    var resultado = {};
+    function evento(el, tipo) { el.dispatchEvent(new Event(tipo, { bubbles: true })); }
+    for (var i = 0; i < campos.length; i++) {
+        var c = campos[i];
+        var el = document.getElementById(c.id);
+        if (!el || el.disabled || el.readOnly) { resultado[c.id] = false; continue; }
+        el.value = c.valor;
+        evento(el, 'input');
+        evento(el, 'change');
+        resultado[c.id] = true;
+    }
+    return resultado;
+"""
+
+def _teclear(driver, campo):
+    # Las máscaras y los onkeyup del SUT solo reaccionan a teclas reales
+    elems = driver.find_elements(By.ID, campo["id"])
+    if not elems or not (elems[0].is_displayed() and elems[0].is_enabled()):
+        return False
+    elems[0].clear()
+    elems[0].send_keys(campo["valor"])
+    return True
+
+def llenar_seccion(driver, seccion, valores):
+    # valores puede ser la fila del Excel o un dict columna -> valor
+    pendientes = [
+        {"id": ubicar(driver, campo_id), "valor": a_texto(valores.get(columna)), "estrategia": estrategia}
+        for columna, campo_id, estrategia in SECCIONES[seccion]
+    ]
+    resultado = {}
+    def _llenar():
+        # Cada intento solo reescribe los campos que quedaron sin llenar
+        nonlocal pendientes
+        esperar_ajax(driver)
+        por_valor = [c for c in pendientes if c["estrategia"] == VALOR]
+        if por_valor:
+            resultado.update(driver.execute_script(_JS_LLENAR, por_valor))
+        for campo in pendientes:
+            if campo["estrategia"] == TECLADO:
+                resultado[campo["id"]] = _teclear(driver, campo)
+        pendientes = [c for c in pendientes if not resultado[c["id"]]]
+        if pendientes:
+            raise RuntimeError(f"campos sin llenar: {', '.join(c['id'] for c in pendientes)}")
+        return resultado
+    return reintentos.ejecutar("llenar_seccion", _llenar, detalle=seccion)
+
+# --- selectOneMenu de PrimeFaces ---
+_JS_SELECCIONAR = """
+    var id = arguments[0];
+    var etiqueta = arguments[1].trim().toLowerCase();
+    var select = document.getElementById(id + '_input');
+    if (!select) { return 'sin_menu'; }
+    var opcion = null;
+    for (var i = 0; i < select.options.length; i++) {
+        if (select.options[i].text.trim().toLowerCase() === etiqueta) { opcion = select.options[i]; break; }
+    }
+    if (!opcion) { return 'sin_opcion'; }
+    var widget = null;
+    if (window.PrimeFaces && PrimeFaces.widgets) {
+        for (var nombre in PrimeFaces.widgets) {
+            var w = PrimeFaces.widgets[nombre];
+            if (w && w.id === id) { widget = w; break; }
+        }
+    }
+    if (widget && typeof widget.selectValue === 'function') {
+        // El widget actualiza la etiqueta y dispara el change con su comportamiento AJAX
+        widget.selectValue(opcion.value);
+    } else {
+        select.value = opcion.value;
+        var label = document.getElementById(id + '_label');
+        if (label) { label.textContent = opcion.text; }
+        select.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+    return 'ok';
+"""
+
+_JS_CLIC_ITEM = """
+    var items = document.querySelectorAll('[id="' + arguments[0] + '_items"] li');
+    var etiqueta = arguments[1].trim().toLowerCase();
+    for (var i = 0; i < items.length; i++) {
+        var texto = (items[i].getAttribute('data-label') || items[i].textContent).trim().toLowerCase();
+        if (texto === etiqueta) { items[i].click(); return true; }
+    }
+    return false;
+"""
+
+def _etiqueta_actual(driver, menu_id):
+    return driver.execute_script(
+        "var l = document.getElementById(arguments[0] + '_label'); return l ? l.textContent : null;",
+        menu_id,
+    )
+
+def seleccionar_opcion(driver, menu_id, etiqueta):
+    # Selecciona por etiqueta visible (ej. "Agosto", "2025") y verifica el resultado
+    etiqueta = a_texto(etiqueta).strip()
+    esperar_ajax(driver)
+    actual = _etiqueta_actual(driver, menu_id)
+    if actual is not None and actual.strip().lower() == etiqueta.lower():
+        return actual.strip()
+
+    estado = driver.execute_script(_JS_SELECCIONAR, menu_id, etiqueta)
+    if estado == "sin_menu":
+        raise RuntimeError(f"❌ No existe la lista {menu_id}")
+    if estado == "sin_opcion":
+        raise RuntimeError(f"❌ La lista {menu_id} no tiene la opción '{etiqueta}'")
+    esperar_ajax(driver)
+
+    actual = _etiqueta_actual(driver, menu_id) or ""
+    if actual.strip().lower() != etiqueta.lower():
+        # Último recurso: desplegar la lista y hacer clic en el ítem como lo haría una persona
+        driver.execute_script("document.getElementById(arguments[0] + '_label').click();", menu_id)
+        driver.execute_script(_JS_CLIC_ITEM, menu_id, etiqueta)
+        esperar_ajax(driver)
+        actual = _etiqueta_actual(driver, menu_id) or ""
+    if actual.strip().lower() != etiqueta.lower():
+        raise RuntimeError(f"❌ La lista {menu_id} quedó en '{actual}' en lugar de '{etiqueta}'")
+    return actual.strip()
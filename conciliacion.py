@@ -0,0 +1,194 @@
+import argparse
+import re
+from html.parser import HTMLParser
+
+import pandas as pd
+
+import autofill
+import bitacora as bitacora_mod
+import entrada
+from bitacora import Bitacora
+from http_sut import ClienteSUT
+
+# Conciliación posterior al lote: se recorre una sola vez el listado de actas
+# registradas del SUT y se compara en bloque con la bitácora y el archivo de entrada.
+
+URL_ACTAS = "https://sut.trabajo.gob.ec/mrl/empresa/actas/listaActas.xhtml"
+FORMULARIO_ACTAS = "frmActas"
+TABLA_ACTAS = "frmActas:dtActas"
+FILAS_POR_PAGINA = 500
+RUTA_CONCILIACION = r"autofill_sut\conciliacion.csv"
+
+CONFIRMADA = "confirmada"    # marcada como enviada y registrada en el SUT
+FALTANTE = "faltante"        # marcada como enviada pero no aparece en el SUT
+INESPERADA = "inesperada"    # registrada en el SUT pero no marcada como enviada
+PENDIENTE = "pendiente"      # ni enviada ni registrada
+
+_RE_IDENTIFICACION = re.compile(r"^\d{10}(\d{3})?$")
+
+# --- Filas de un datatable de PrimeFaces ---
+class _LectorFilas(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.filas = []
+        self._celda = None
+        self._vacia = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self.filas.append([])
+            self._vacia = "ui-datatable-empty-message" in (dict(attrs).get("class") or "")
+        elif tag == "td" and self.filas and not self._vacia:
+            self._celda = []
+
+    def handle_endtag(self, tag):
+        if tag == "td" and self._celda is not None:
+            self.filas[-1].append(" ".join(self._celda).strip())
+            self._celda = None
+
+    def handle_data(self, data):
+        if self._celda is not None and data.strip():
+            self._celda.append(data.strip())
+
+def filas_en(html):
+    # Filas de datos: sin las de encabezado (solo <th>) ni la de "sin registros"
+    lector = _LectorFilas()
+    lector.feed(html)
+    return [celdas for celdas in lector.filas if celdas]
+
+def identificaciones_en(html, columna=None):
+    return _identificaciones(filas_en(html), columna)
+
+def _identificaciones(filas, columna=None):
+    # Con columna=None se toma la primera celda con forma de cédula (10) o RUC (13)
+    encontradas = []
+    for celdas in filas:
+        if columna is not None:
+            if columna < len(celdas) and celdas[columna]:
+                encontradas.append(celdas[columna])
+            continue
+        for celda in celdas:
+            if _RE_IDENTIFICACION.match(celda):
+                encontradas.append(celda)
+                break
+    return encontradas
+
+# --- Recorrido del listado ---
+def actas_registradas(cookies, url=URL_ACTAS, tabla=TABLA_ACTAS, formulario=FORMULARIO_ACTAS,
+                      filas_por_pagina=FILAS_POR_PAGINA, columna=None):
+    # Pide las páginas del datatable como peticiones parciales (las mismas que
+    # dispara el paginador) hasta que una página llega sin filas. Se avanza por
+    # filas, no por identificaciones reconocidas: una página con pasaportes u
+    # otros formatos no debe cortar ni desalinear el recorrido.
+    cliente = ClienteSUT(url, cookies, formulario=formulario).abrir()
+    registradas = set()
+    primera = 0
+    paginas = 0
+    anterior = None
+    while True:
+        parcial = cliente.parcial(tabla, "page", tabla, tabla, {
+            f"{tabla}_pagination": "true",
+            f"{tabla}_first": str(primera),
+            f"{tabla}_rows": str(filas_por_pagina),
+            f"{tabla}_encodeFeature": "true",
+        })
+        filas = filas_en(parcial["actualizaciones"].get(tabla, ""))
+        if not filas or filas == anterior:
+            # Página vacía, o el SUT ignoró _first y repitió la anterior
+            break
+        paginas += 1
+        registradas.update(_identificaciones(filas, columna))
+        primera += len(filas)
+        anterior = filas
+        print(f"📄 Página {paginas}: {len(registradas)} actas registradas hasta ahora")
+    return registradas
+
+def cookies_del_navegador(debugger_address, url=URL_ACTAS):
+    # Reutiliza la sesión iniciada en el Chrome de depuración
+    driver = autofill.conectar_driver(debugger_address)
+    try:
+        if not driver.current_url.startswith(url.split("/mrl/")[0]):
+            driver.get(url)
+        return {c["name"]: c["value"] for c in driver.get_cookies()}
+    finally:
+        driver.quit()
+
+# --- Comparación en bloque ---
+def _normalizar(serie):
+    return serie.fillna("").astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+
+def conciliar(ruta_datos, bitacora, registradas):
+    # Devuelve (reporte por identificación del archivo, identificaciones del SUT ajenas al archivo)
+    bloques = entrada.leer_bloques(ruta_datos, columnas=["Identificacion", "Enviado"], saltar_enviados=False)
+    datos = pd.concat(list(bloques) or [pd.DataFrame(columns=["Identificacion", "Enviado"])])
+    datos["Identificacion"] = _normalizar(datos["Identificacion"])
+    datos = datos[datos["Identificacion"] != ""].drop_duplicates(subset="Identificacion")
+
+    enviada = datos["Identificacion"].isin(bitacora.enviados()) | (datos["Enviado"].fillna("").str.strip() == "Sí")
+    en_sut = datos["Identificacion"].isin(registradas)
+    reporte = pd.DataFrame({"Identificacion": datos["Identificacion"], "Enviada": enviada, "En SUT": en_sut})
+    reporte["Conciliacion"] = PENDIENTE
+    reporte.loc[enviada & en_sut, "Conciliacion"] = CONFIRMADA
+    reporte.loc[enviada & ~en_sut, "Conciliacion"] = FALTANTE
+    reporte.loc[~enviada & en_sut, "Conciliacion"] = INESPERADA
+    ajenas = registradas - set(datos["Identificacion"])
+    return reporte, ajenas
+
+def marcar(bitacora, reporte, ruta_datos=None):
+    # Las faltantes vuelven a quedar pendientes (error) y las inesperadas pasan a enviadas.
+    # Con ruta_datos también se reescribe la columna Enviado del archivo, porque una
+    # marca "Sí" vieja haría que el próximo lote saltara las faltantes.
+    bitacora.fijar_estado(reporte.loc[reporte["Conciliacion"] == FALTANTE, "Identificacion"],
+                          bitacora_mod.ERROR, "No aparece en el listado de actas del SUT")
+    bitacora.fijar_estado(reporte.loc[reporte["Conciliacion"] == INESPERADA, "Identificacion"],
+                          bitacora_mod.ENVIADO)
+    if ruta_datos:
+        bitacora.exportar(entrada.leer_todo(ruta_datos), ruta_datos)
+
+def imprimir_resumen(reporte, ajenas):
+    conteo = reporte["Conciliacion"].value_counts()
+    print("🔎 Conciliación contra el listado de actas del SUT")
+    print(f"   ✅ Confirmadas: {conteo.get(CONFIRMADA, 0)}")
+    print(f"   ❌ Faltantes (marcadas como enviadas, sin acta en el SUT): {conteo.get(FALTANTE, 0)}")
+    print(f"   ⚠️ Inesperadas (con acta en el SUT, sin marcar como enviadas): {conteo.get(INESPERADA, 0)}")
+    print(f"   🕒 Pendientes: {conteo.get(PENDIENTE, 0)}")
+    print(f"   Actas del SUT que no están en el archivo: {len(ajenas)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conciliar el lote con el listado de actas registradas del SUT")
+    parser.add_argument("--datos", default=autofill.RUTA_DATOS, help="Archivo de entrada (xlsx, csv, parquet)")
+    parser.add_argument("--bitacora", default=autofill.RUTA_BITACORA)
+    parser.add_argument("--url-actas", default=URL_ACTAS, help="URL del listado de actas registradas")
+    parser.add_argument("--tabla", default=TABLA_ACTAS, help="Id del datatable del listado")
+    parser.add_argument("--columna", type=int, default=None,
+                        help="Columna de la identificación en el listado (por defecto se detecta)")
+    parser.add_argument("--filas", type=int, default=FILAS_POR_PAGINA, help="Filas pedidas por página")
+    parser.add_argument("--cookie", action="append", default=[],
+                        help="Cookie de sesión del SUT, NOMBRE=VALOR (ej. JSESSIONID=...)")
+    parser.add_argument("--debugger", default=None,
+                        help="Tomar las cookies de sesión del Chrome de depuración (ej. 127.0.0.1:9222)")
+    parser.add_argument("--salida", default=RUTA_CONCILIACION, help="CSV con el resultado por identificación")
+    parser.add_argument("--marcar", action="store_true",
+                        help="Actualizar la bitácora y la columna Enviado de --datos: faltantes a error, inesperadas a enviadas")
+    args = parser.parse_args(argv)
+
+    cookies = dict(c.split("=", 1) for c in args.cookie)
+    if args.debugger:
+        cookies.update(cookies_del_navegador(args.debugger, args.url_actas))
+    formulario = args.tabla.split(":")[0]
+    registradas = actas_registradas(cookies, args.url_actas, args.tabla, formulario, args.filas, args.columna)
+
+    bitacora = Bitacora(args.bitacora)
+    try:
+        reporte, ajenas = conciliar(args.datos, bitacora, registradas)
+        reporte.to_csv(args.salida, index=False, encoding="utf-8-sig")
+        imprimir_resumen(reporte, ajenas)
+        print(f"💾 Detalle por identificación en {args.salida}")
+        if args.marcar:
+            marcar(bitacora, reporte, args.datos)
+            print("✅ Bitácora actualizada con el resultado de la conciliación")
+    finally:
+        bitacora.cerrar()
+
+if __name__ == "__main__":
+    main()
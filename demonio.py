@@ -0,0 +1,341 @@
+import argparse
+import glob
+import json
+import os
+import queue
+import shutil
+import socket
+import socketserver
+import threading
+import time
+
+import pandas as pd
+
+import autofill
+import bitacora as bitacora_mod
+import entrada
+import localizadores
+import trazas
+from bitacora import Bitacora
+import salud as salud_mod
+from salud import MonitorSalud
+from trazas import tramo
+from validacion import validar
+
+# Proceso residente: mantiene el driver conectado y el formulario cargado, y atiende
+# trabajos (filas sueltas o archivos completos) por un socket local o una carpeta
+# vigilada. Los resultados se devuelven fila por fila como líneas JSON.
+
+HOST_DEMONIO = "127.0.0.1"
+PUERTO_DEMONIO = 8765
+EXTENSIONES = tuple(entrada.LECTORES)
+
+# --- Trabajo en cola ---
+class Trabajo:
+    def __init__(self, filas=None, archivo=None, limite=None):
+        self.filas = filas
+        self.archivo = archivo
+        self.limite = limite
+        self.salida = queue.Queue()
+
+    def emitir(self, evento):
+        self.salida.put(evento)
+
+    def resultados(self):
+        # Generador para quien envió el trabajo; termina con el evento "fin"
+        while True:
+            evento = self.salida.get()
+            yield evento
+            if evento.get("evento") == "fin":
+                return
+
+# --- Demonio: un hilo dueño del driver que consume la cola de trabajos ---
+class Demonio:
+    def __init__(self, debugger=autofill.DEBUGGER_ADDRESS, ruta_bitacora=autofill.RUTA_BITACORA,
+                 url=autofill.URL_FORMULARIO, causas=None, ruta_trazas=None,
+                 ruta_localizadores=localizadores.RUTA_LOCALIZADORES, limites=None):
+        self.debugger = debugger
+        self.ruta_bitacora = ruta_bitacora
+        self.url = url
+        self.causas = causas
+        self.ruta_trazas = ruta_trazas
+        self.ruta_localizadores = ruta_localizadores
+        self.limites = limites or {}
+        self.cola = queue.Queue()
+        self.listo = threading.Event()
+        self.error_inicio = None
+        self.driver = None
+        self.traza = None
+        self.salud = None
+        self._hilo = threading.Thread(target=self._ejecutar, name="demonio-driver", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        self.listo.wait()
+        if self.error_inicio:
+            raise RuntimeError(self.error_inicio)
+
+    def detener(self):
+        self.cola.put(None)
+        self._hilo.join()
+
+    def enviar(self, trabajo):
+        self.cola.put(trabajo)
+        return trabajo
+
+    def _ejecutar(self):
+        # Driver, bitácora SQLite y traza se crean y usan solo en este hilo
+        try:
+            self.traza = trazas.activar(trazas.Traza(self.ruta_trazas))
+            localizadores.activar(localizadores.IndiceLocalizadores(self.ruta_localizadores))
+            self.bitacora = Bitacora(self.ruta_bitacora)
+            self.salud = MonitorSalud(self._conectar, lambda d: autofill.cargar_formulario(d, self.url),
+                                      **self.limites)
+            self.driver = self._conectar()
+            autofill.cargar_formulario(self.driver, self.url)
+        except Exception as e:
+            self.error_inicio = f"❌ No se pudo preparar el navegador: {e}"
+            self.listo.set()
+            return
+        print(f"✅ Navegador conectado en {self.debugger} y formulario cargado")
+        self.listo.set()
+
+        try:
+            while True:
+                trabajo = self.cola.get()
+                if trabajo is None:
+                    break
+                try:
+                    self._atender(trabajo)
+                except Exception as e:
+                    trabajo.emitir({"evento": "fin", "error": str(e)})
+        finally:
+            self.bitacora.cerrar()
+
+    def _conectar(self):
+        return self.traza.instrumentar(autofill.conectar_driver(self.debugger))
+
+    def _atender(self, trabajo):
+        inicio = time.perf_counter()
+        if trabajo.archivo:
+            df_datos = entrada.leer_todo(trabajo.archivo)
+            self.bitacora.importar_enviados(df_datos)
+        else:
+            df_datos = pd.DataFrame(trabajo.filas, dtype=str)
+            if 'Enviado' not in df_datos.columns:
+                df_datos['Enviado'] = ""
+
+        try:
+            limpios, rechazos = validar(df_datos, self.causas)
+        except ValueError as e:
+            trabajo.emitir({"evento": "fin", "error": str(e)})
+            return
+        for _, row in rechazos.iterrows():
+            trabajo.emitir({"evento": "fila", "identificacion": str(row.get('Identificacion', "")),
+                            "estado": "rechazada", "error": row['Motivo']})
+
+        pendientes = self.bitacora.pendientes(limpios)
+        omitidas = len(limpios) - len(pendientes)
+        if trabajo.limite is not None:
+            pendientes = pendientes.head(trabajo.limite)
+
+        procesadas = fallidas = 0
+        fin = {}
+        for _, row in pendientes.iterrows():
+            error, duracion = self._procesar(row)
+            if error:
+                fallidas += 1
+                print(f"❌ Error procesando identificación {row['Identificacion']}: {error}")
+            else:
+                procesadas += 1
+                print(f"✅ Registro con Identificación {row['Identificacion']} procesado")
+            trabajo.emitir({"evento": "fila", "identificacion": row['Identificacion'],
+                            "estado": bitacora_mod.ERROR if error else bitacora_mod.ENVIADO,
+                            "error": error, "duracion_s": round(duracion, 3)})
+            try:
+                self._cuidar_salud(duracion)
+            except RuntimeError as e:
+                print(f"❌ {e}; se detiene el trabajo")
+                fin["error"] = str(e)
+                break
+
+        if trabajo.archivo:
+            self.bitacora.exportar(df_datos, trabajo.archivo)
+        trabajo.emitir({"evento": "fin", "procesadas": procesadas, "fallidas": fallidas,
+                        "rechazadas": len(rechazos), "omitidas": omitidas,
+                        "total_s": round(time.perf_counter() - inicio, 3), **fin})
+
+    def _cuidar_salud(self, duracion):
+        # Un demonio vive horas: la pestaña se recicla cuando se degrada. Va
+        # después de registrar la fila; si no se puede reciclar, el trabajo
+        # se corta y su evento "fin" lleva el error.
+        try:
+            self.driver = self.salud.despues_de_fila(self.driver, duracion)
+        except Exception as e:
+            raise RuntimeError(f"No se pudo recuperar el navegador: {e}") from e
+
+    def _procesar(self, row):
+        self.traza.iniciar_fila(row['Identificacion'])
+        inicio = time.perf_counter()
+        error = None
+        try:
+            with tramo("fila"):
+                # El formulario puede haber quedado en cualquier estado desde el
+                # trabajo anterior; si el filtro está visible no se navega.
+                with tramo("volver_a_busqueda"):
+                    autofill.volver_a_busqueda(self.driver, url=self.url)
+                autofill.procesar_fila(self.driver, row)
+        except Exception as e:
+            error = str(e)
+        duracion = time.perf_counter() - inicio
+        with tramo("escritura"):
+            self.bitacora.registrar(row['Identificacion'], bitacora_mod.ERROR if error else bitacora_mod.ENVIADO,
+                                    error)
+        self.traza.cerrar_fila()
+        return error, duracion
+
+# --- Socket local: una línea JSON por trabajo, una línea JSON por resultado ---
+class _Manejador(socketserver.StreamRequestHandler):
+    def handle(self):
+        linea = self.rfile.readline()
+        if not linea:
+            return
+        try:
+            pedido = json.loads(linea)
+        except ValueError as e:
+            self._responder({"evento": "fin", "error": f"Pedido inválido: {e}"})
+            return
+        if pedido.get("accion") == "detener":
+            self._responder({"evento": "fin", "detenido": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if pedido.get("fila"):
+            pedido["filas"] = [pedido["fila"]]
+        if not pedido.get("filas") and not pedido.get("archivo"):
+            self._responder({"evento": "fin", "error": "El pedido necesita 'fila', 'filas' o 'archivo'"})
+            return
+
+        trabajo = self.server.demonio.enviar(
+            Trabajo(pedido.get("filas"), pedido.get("archivo"), pedido.get("limite"))
+        )
+        self._responder({"evento": "en_cola", "pendientes": self.server.demonio.cola.qsize()})
+        for evento in trabajo.resultados():
+            self._responder(evento)
+
+    def _responder(self, evento):
+        self.wfile.write((json.dumps(evento, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+class ServidorDemonio(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, demonio, host=HOST_DEMONIO, puerto=PUERTO_DEMONIO):
+        super().__init__((host, puerto), _Manejador)
+        self.demonio = demonio
+
+# --- Carpeta vigilada: cada archivo dejado ahí es un trabajo ---
+def vigilar_carpeta(demonio, carpeta, intervalo=1.0, detener=None):
+    procesados = os.path.join(carpeta, "procesados")
+    os.makedirs(procesados, exist_ok=True)
+    detener = detener or threading.Event()
+    while not detener.is_set():
+        for ruta in sorted(glob.glob(os.path.join(carpeta, "*"))):
+            if not ruta.lower().endswith(EXTENSIONES) or os.path.basename(ruta).startswith("~$"):
+                continue
+            destino = os.path.join(procesados, os.path.basename(ruta))
+            shutil.move(ruta, destino)
+            print(f"📥 Nuevo trabajo en carpeta: {os.path.basename(ruta)}")
+            trabajo = demonio.enviar(Trabajo(archivo=destino))
+            with open(destino + ".resultados.jsonl", "w", encoding="utf-8") as f:
+                for evento in trabajo.resultados():
+                    f.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+                    f.flush()
+        detener.wait(intervalo)
+
+# --- Cliente ---
+def enviar(pedido, host=HOST_DEMONIO, puerto=PUERTO_DEMONIO):
+    # Generador con los eventos que devuelve el demonio para este pedido
+    with socket.create_connection((host, puerto)) as conexion:
+        conexion.sendall((json.dumps(pedido, ensure_ascii=False) + "\n").encode("utf-8"))
+        with conexion.makefile("r", encoding="utf-8") as lector:
+            for linea in lector:
+                yield json.loads(linea)
+
+def _imprimir_evento(evento):
+    if evento["evento"] == "en_cola":
+        print(f"🕒 Trabajo recibido ({evento['pendientes']} en cola)")
+    elif evento["evento"] == "fila" and evento["estado"] == bitacora_mod.ENVIADO:
+        print(f"✅ {evento['identificacion']} procesado en {evento['duracion_s']:.2f} s")
+    elif evento["evento"] == "fila":
+        print(f"❌ {evento['identificacion']} ({evento['estado']}): {evento['error']}")
+    elif evento.get("error"):
+        print(f"❌ {evento['error']}")
+    elif evento.get("detenido"):
+        print("🛑 Demonio detenido")
+    else:
+        print(f"📊 Procesadas: {evento['procesadas']} | fallidas: {evento['fallidas']} | "
+              f"rechazadas: {evento['rechazadas']} | ya enviadas: {evento['omitidas']} | "
+              f"{evento['total_s']:.1f} s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Demonio de llenado del SUT con cola de trabajos local")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    servir = sub.add_parser("servir", help="Conectar al navegador y atender trabajos")
+    servir.add_argument("--debugger", default=autofill.DEBUGGER_ADDRESS, help="Dirección de depuración de Chrome")
+    servir.add_argument("--puerto", type=int, default=PUERTO_DEMONIO, help="Puerto local del demonio")
+    servir.add_argument("--carpeta", default=None, help="Carpeta vigilada: cada .xlsx/.csv/.json es un trabajo")
+    servir.add_argument("--bitacora", default=autofill.RUTA_BITACORA)
+    servir.add_argument("--causas", default=None, help="Números de causa que existen en el SUT (ej. 1,2,5)")
+    servir.add_argument("--trazas", default=None, help="Exportar los tiempos por paso a .jsonl o .csv")
+    servir.add_argument("--localizadores", default=localizadores.RUTA_LOCALIZADORES)
+    servir.add_argument("--url", default=autofill.URL_FORMULARIO)
+    salud_mod.agregar_opciones(servir)
+
+    cliente = sub.add_parser("enviar", help="Enviar un trabajo al demonio y mostrar los resultados")
+    cliente.add_argument("--puerto", type=int, default=PUERTO_DEMONIO)
+    cliente.add_argument("--archivo", default=None, help="Excel/CSV/JSON con filas a procesar")
+    cliente.add_argument("--fila", default=None, help="Una fila como objeto JSON con las columnas del Excel")
+    cliente.add_argument("--limit", type=int, default=None, help="Procesar como máximo N filas del archivo")
+    cliente.add_argument("--detener", action="store_true", help="Detener el demonio")
+    args = parser.parse_args(argv)
+
+    if args.comando == "enviar":
+        if args.detener:
+            pedido = {"accion": "detener"}
+        elif args.fila:
+            pedido = {"fila": json.loads(args.fila)}
+        elif args.archivo:
+            pedido = {"archivo": os.path.abspath(args.archivo), "limite": args.limit}
+        else:
+            parser.error("enviar necesita --archivo, --fila o --detener")
+        for evento in enviar(pedido, puerto=args.puerto):
+            _imprimir_evento(evento)
+        return
+
+    causas = [c.strip() for c in args.causas.split(",")] if args.causas else None
+    demonio = Demonio(args.debugger, args.bitacora, args.url, causas, args.trazas, args.localizadores,
+                      salud_mod.limites(args))
+    demonio.iniciar()
+    servidor = ServidorDemonio(demonio, puerto=args.puerto)
+    detener = threading.Event()
+    if args.carpeta:
+        threading.Thread(target=vigilar_carpeta, args=(demonio, args.carpeta, 1.0, detener), daemon=True).start()
+        print(f"👀 Vigilando {args.carpeta}")
+    print(f"🟢 Demonio escuchando en {HOST_DEMONIO}:{args.puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detener.set()
+        servidor.server_close()
+        demonio.detener()
+        if demonio.traza:
+            demonio.traza.imprimir_resumen()
+        if demonio.salud:
+            demonio.salud.imprimir_resumen()
+
+if __name__ == "__main__":
+    main()
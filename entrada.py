@@ -0,0 +1,140 @@
+import json
+
+import pandas as pd
+
+from validacion import BANDERAS, NUMERICAS, OBLIGATORIAS, TEXTOS, validar
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pq = None
+
+# --- Columnas que usa el flujo; las demás del archivo no se leen ---
+COLUMNAS = list(dict.fromkeys(OBLIGATORIAS + NUMERICAS + BANDERAS + TEXTOS + ["Fecha de Salida"]))
+TAMANIO_BLOQUE = 2000
+
+def _enviado(serie):
+    return serie.fillna("").astype(str).str.strip() == "Sí"
+
+# --- Lectores por formato: generan DataFrames de a lo sumo `tamanio` filas ---
+def _bloques_xlsx(ruta, columnas, tamanio):
+    import openpyxl
+    # read_only recorre el XML de la hoja sin construir el libro completo en memoria
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = [str(c).strip() if c is not None else "" for c in next(filas, ())]
+        indices = {}
+        for i, nombre in enumerate(encabezado):
+            if nombre and (columnas is None or nombre in columnas) and nombre not in indices:
+                indices[nombre] = i
+        bloque = []
+        for fila in filas:
+            registro = {c: (str(fila[i]) if i < len(fila) and fila[i] is not None else None)
+                        for c, i in indices.items()}
+            if all(v is None for v in registro.values()):
+                continue
+            bloque.append(registro)
+            if len(bloque) >= tamanio:
+                yield pd.DataFrame(bloque, columns=list(indices))
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=list(indices))
+    finally:
+        libro.close()
+
+def _bloques_csv(ruta, columnas, tamanio):
+    yield from pd.read_csv(ruta, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                           usecols=None if columnas is None else (lambda c: c in columnas),
+                           chunksize=tamanio)
+
+def _bloques_parquet(ruta, columnas, tamanio):
+    if pq is None:
+        raise RuntimeError("❌ Leer Parquet necesita el paquete 'pyarrow' (pip install pyarrow)")
+    archivo = pq.ParquetFile(ruta)
+    presentes = [c for c in archivo.schema_arrow.names if columnas is None or c in columnas]
+    for lote in archivo.iter_batches(batch_size=tamanio, columns=presentes):
+        yield lote.to_pandas().astype("string").astype(object)
+
+def _bloques_json(ruta, columnas, tamanio):
+    # Lista de objetos (la misma forma que acepta demonio.py); se lee completa
+    with open(ruta, encoding="utf-8") as f:
+        registros = json.load(f)
+    for i in range(0, len(registros), tamanio):
+        df = pd.DataFrame(registros[i:i + tamanio], dtype=str)
+        yield df if columnas is None else df[[c for c in df.columns if c in columnas]]
+
+LECTORES = {
+    ".xlsx": _bloques_xlsx,
+    ".xlsm": _bloques_xlsx,
+    ".csv": _bloques_csv,
+    ".parquet": _bloques_parquet,
+    ".json": _bloques_json,
+}
+
+def leer_bloques(ruta, tamanio=TAMANIO_BLOQUE, columnas=COLUMNAS, saltar_enviados=True):
+    # Genera bloques con solo `columnas` (None = todas), sin las filas marcadas
+    # Enviado = "Sí". El índice sigue la posición de la fila en el archivo.
+    extension = "." + ruta.rsplit(".", 1)[-1].lower()
+    if extension not in LECTORES:
+        raise ValueError(f"❌ Formato no soportado: {ruta} (use {', '.join(LECTORES)})")
+    desplazamiento = 0
+    columnas = None if columnas is None else set(columnas)
+    for bloque in LECTORES[extension](ruta, columnas, tamanio):
+        bloque.index = pd.RangeIndex(desplazamiento, desplazamiento + len(bloque))
+        desplazamiento += len(bloque)
+        if 'Enviado' not in bloque.columns:
+            bloque['Enviado'] = ""
+        if saltar_enviados:
+            bloque = bloque[~_enviado(bloque['Enviado'])]
+        if not bloque.empty:
+            yield bloque
+
+def leer_todo(ruta):
+    # Archivo completo con todas sus columnas (para reescribir la columna Enviado)
+    if ruta.lower().endswith((".xlsx", ".xlsm")):
+        df_datos = pd.read_excel(ruta, dtype=str)
+    else:
+        bloques = list(leer_bloques(ruta, TAMANIO_BLOQUE, None, saltar_enviados=False))
+        df_datos = pd.concat(bloques) if bloques else pd.DataFrame(columns=COLUMNAS)
+    if 'Enviado' not in df_datos.columns:
+        df_datos['Enviado'] = ""
+    return df_datos
+
+def escribir_todo(df_datos, ruta):
+    # Reescribe el archivo en su propio formato
+    extension = "." + ruta.rsplit(".", 1)[-1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        df_datos.to_excel(ruta, index=False)
+    elif extension == ".csv":
+        df_datos.to_csv(ruta, index=False, encoding="utf-8-sig")
+    elif extension == ".parquet":
+        if pq is None:
+            raise RuntimeError("❌ Escribir Parquet necesita el paquete 'pyarrow' (pip install pyarrow)")
+        df_datos.to_parquet(ruta, index=False)
+    elif extension == ".json":
+        df_datos.to_json(ruta, orient="records", force_ascii=False, indent=2)
+    else:
+        raise ValueError(f"❌ Formato no soportado: {ruta} (use {', '.join(LECTORES)})")
+
+# --- Validación bloque a bloque ---
+def validar_bloques(bloques, causas_validas=None, rechazos=None):
+    # Como validacion.validar, pero sin materializar el archivo. Las identificaciones
+    # repetidas entre bloques también se rechazan; los rechazos se agregan a la lista
+    # `rechazos` si se pasa una.
+    vistas = set()
+    for bloque in bloques:
+        limpios, rechazados = validar(bloque, causas_validas)
+        identificaciones = (bloque['Identificacion'].fillna("").astype(str).str.strip()
+                            .str.replace(r"\.0$", "", regex=True))
+        repetidas = limpios.index[identificaciones[limpios.index].isin(vistas)]
+        vistas.update(identificaciones[identificaciones != ""])
+        if len(repetidas):
+            extra = bloque.loc[repetidas].copy()
+            extra["Motivo"] = "Identificacion repetida"
+            rechazados = pd.concat([rechazados, extra])
+            limpios = limpios.drop(repetidas)
+        if rechazos is not None and not rechazados.empty:
+            rechazos.append(rechazados)
+        if not limpios.empty:
+            yield limpios
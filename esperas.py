@@ -0,0 +1,56 @@
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Tiempo máximo por espera: alto a propósito, porque la espera termina apenas la
+# página queda inactiva y en cierre de mes el SUT puede tardar varios segundos.
+TIMEOUT_AJAX = 30
+POLL_AJAX = 0.05
+
+# --- Estado de la página ---
+_JS_AJAX_INACTIVO = """
+    if (document.readyState !== 'complete') { return false; }
+    var pf = window.PrimeFaces;
+    if (pf && pf.ajax && pf.ajax.Queue) {
+        var cola = pf.ajax.Queue;
+        if (typeof cola.isEmpty === 'function' ? !cola.isEmpty() : (cola.requests || []).length > 0) {
+            return false;
+        }
+    }
+    var jq = window.jQuery;
+    return !jq || jq.active === 0;
+"""
+
+_JS_MARCAR = """
+    var el = document.getElementById(arguments[0]);
+    if (el) { el.__autofillMarca = true; }
+    return !!el;
+"""
+
+_JS_RERENDERIZADO = """
+    var el = document.getElementById(arguments[0]);
+    return !!el && !el.__autofillMarca;
+"""
+
+def ajax_inactivo(driver):
+    return bool(driver.execute_script(_JS_AJAX_INACTIVO))
+
+def esperar_ajax(driver, timeout=TIMEOUT_AJAX):
+    # Bloquea hasta que la cola AJAX de PrimeFaces esté vacía y jQuery.active == 0
+    WebDriverWait(driver, timeout, poll_frequency=POLL_AJAX).until(ajax_inactivo)
+
+# --- Re-renderizado de componentes ---
+def marcar_componente(driver, componente_id):
+    # PrimeFaces reemplaza el nodo completo en cada actualización parcial, así que
+    # la marca desaparece cuando el componente se vuelve a renderizar.
+    return bool(driver.execute_script(_JS_MARCAR, componente_id))
+
+def esperar_rerender(driver, componente_id, timeout=TIMEOUT_AJAX):
+    def _listo(d):
+        return ajax_inactivo(d) and bool(d.execute_script(_JS_RERENDERIZADO, componente_id))
+    WebDriverWait(driver, timeout, poll_frequency=POLL_AJAX).until(_listo)
+
+def ejecutar_y_esperar(driver, componente_id, accion, timeout=TIMEOUT_AJAX):
+    # Ejecuta la acción y espera a que el servidor vuelva a renderizar el componente.
+    # Si el componente no existía antes de la acción basta con que aparezca.
+    marcar_componente(driver, componente_id)
+    accion()
+    esperar_rerender(driver, componente_id, timeout)
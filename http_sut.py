@@ -0,0 +1,313 @@
+import queue
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+
+import pandas as pd
+
+import calculo
+import reintentos
+from reintentos import ErrorFatal
+from validacion import a_texto
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # el motor HTTP es opcional
+    requests = None
+
+URL_FORMULARIO = "https://sut.trabajo.gob.ec/mrl/empresa/actas/registroActaFrm.xhtml"
+FORMULARIO = "frmLegal"
+
+# Diálogo de remuneración pendiente: columna del Excel -> campo del formulario
+DIALOGO_REMUNERACION = {
+    "Salario_pendiente": "frmLegal:txtDlg001",
+    "Sueldo_nominal": "frmLegal:txtDlg0012",
+    "Horas_suplementarias": "frmLegal:txtDlg002",
+    "Horas_extraordinarias": "frmLegal:txtDlg004",
+    "Horas_nocturnas": "frmLegal:txtDlg004n",
+}
+
+_RE_VIEWSTATE = re.compile(
+    r'name="javax\.faces\.ViewState"[^>]*value="([^"]*)"|value="([^"]*)"[^>]*name="javax\.faces\.ViewState"'
+)
+
+# --- Lectura de HTML (página completa o fragmentos de la respuesta parcial) ---
+class _LectorCampos(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.valores = {}
+        self.textos = []
+        # select -> {etiqueta visible: value}, para elegir opciones por etiqueta como el navegador
+        self.opciones = {}
+        self._select = None
+        self._opcion = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("input", "textarea") and attrs.get("id"):
+            self.valores[attrs["id"]] = attrs.get("value") or ""
+        elif tag == "select" and attrs.get("id"):
+            self._select = attrs["id"]
+            self.opciones[self._select] = {}
+        elif tag == "option" and self._select:
+            self._opcion = [attrs.get("value"), ""]
+
+    def handle_endtag(self, tag):
+        if tag == "option" and self._opcion is not None:
+            valor, etiqueta = self._opcion
+            etiqueta = etiqueta.strip()
+            self.opciones[self._select][etiqueta.lower()] = etiqueta if valor is None else valor
+            self._opcion = None
+        elif tag == "select":
+            self._select = None
+
+    def handle_data(self, data):
+        if self._opcion is not None:
+            self._opcion[1] += data
+        if data.strip():
+            self.textos.append(data.strip())
+
+def leer_campos(html):
+    lector = _LectorCampos()
+    lector.feed(html)
+    return lector
+
+def extraer_viewstate(html):
+    coincidencia = _RE_VIEWSTATE.search(html)
+    if not coincidencia:
+        return None
+    return coincidencia.group(1) if coincidencia.group(1) is not None else coincidencia.group(2)
+
+# --- Respuesta parcial JSF (<partial-response>) ---
+def leer_respuesta_parcial(xml):
+    raiz = ET.fromstring(xml)
+    respuesta = {"actualizaciones": {}, "errores": [], "redireccion": None, "viewstate": None}
+    for update in raiz.iter("update"):
+        id_componente = update.get("id", "")
+        contenido = update.text or ""
+        if "javax.faces.ViewState" in id_componente:
+            respuesta["viewstate"] = contenido
+        else:
+            respuesta["actualizaciones"][id_componente] = contenido
+    for error in raiz.iter("error"):
+        nombre = error.findtext("error-name") or ""
+        mensaje = error.findtext("error-message") or ""
+        respuesta["errores"].append(f"{nombre}: {mensaje}".strip(": "))
+    redirect = raiz.find(".//redirect")
+    if redirect is not None:
+        respuesta["redireccion"] = redirect.get("url")
+    return respuesta
+
+# --- Cliente HTTP contra registroActaFrm.xhtml ---
+class ClienteSUT:
+    def __init__(self, url=URL_FORMULARIO, cookies=None, timeout=30, conexiones=10, formulario=FORMULARIO):
+        if requests is None:
+            raise ErrorFatal("❌ El motor HTTP necesita el paquete 'requests' (pip install requests)")
+        self.url = url
+        self.formulario = formulario
+        self.timeout = timeout
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+        for nombre, valor in (cookies or {}).items():
+            self.sesion.cookies.set(nombre, valor)
+        self.viewstate = None
+        self.valores = {}
+        self.opciones = {}
+
+    def abrir(self):
+        respuesta = self.sesion.get(self.url, timeout=self.timeout)
+        respuesta.raise_for_status()
+        self.viewstate = extraer_viewstate(respuesta.text)
+        if not self.viewstate:
+            raise ErrorFatal("❌ No se encontró javax.faces.ViewState: ¿la sesión del SUT sigue activa?")
+        lector = leer_campos(respuesta.text)
+        self.valores = lector.valores
+        self.opciones = lector.opciones
+        return self
+
+    def parcial(self, fuente, evento=None, ejecutar=None, renderizar=None, valores=None):
+        # Equivalente a PrimeFaces.ab({s: fuente, e: evento, p: ejecutar, u: renderizar})
+        datos = {
+            "javax.faces.partial.ajax": "true",
+            "javax.faces.source": fuente,
+            "javax.faces.partial.execute": ejecutar or fuente,
+            self.formulario: self.formulario,
+        }
+        if renderizar:
+            datos["javax.faces.partial.render"] = renderizar
+        if evento:
+            datos["javax.faces.behavior.event"] = evento
+            datos["javax.faces.partial.event"] = evento
+        else:
+            datos[fuente] = fuente
+        datos.update(valores or {})
+        datos["javax.faces.ViewState"] = self.viewstate
+
+        respuesta = self.sesion.post(self.url, data=datos, timeout=self.timeout, headers={
+            "Faces-Request": "partial/ajax",
+            "X-Requested-With": "XMLHttpRequest",
+        })
+        respuesta.raise_for_status()
+        parcial = leer_respuesta_parcial(respuesta.text)
+        if parcial["errores"]:
+            raise RuntimeError(f"❌ Error del SUT en {fuente}: {'; '.join(parcial['errores'])}")
+        if parcial["redireccion"]:
+            raise ErrorFatal(f"❌ El SUT redirigió a {parcial['redireccion']}: ¿sesión expirada?")
+        if parcial["viewstate"]:
+            self.viewstate = parcial["viewstate"]
+        for html in parcial["actualizaciones"].values():
+            lector = leer_campos(html)
+            self.valores.update(lector.valores)
+            self.opciones.update(lector.opciones)
+        return parcial
+
+    def cambiar(self, campo, valor, renderizar=None):
+        # Lo que hace el navegador al escribir en un campo y disparar su change
+        return self.parcial(campo, "change", campo, renderizar, {campo: a_texto(valor)})
+
+    def seleccionar(self, menu, etiqueta):
+        # selectOneMenu: se envía el value de la opción cuya etiqueta coincide
+        etiqueta = a_texto(etiqueta).strip()
+        opciones = self.opciones.get(f"{menu}_input")
+        if opciones is None:
+            raise RuntimeError(f"❌ No existe la lista {menu}")
+        if etiqueta.lower() not in opciones:
+            raise RuntimeError(f"❌ La lista {menu} no tiene la opción '{etiqueta}'")
+        return self.parcial(menu, "change", menu, menu, {f"{menu}_input": opciones[etiqueta.lower()]})
+
+    def elegir_radio(self, grupo, si):
+        # Radios Sí (:0) / No (:1); el value se toma de la página como lo enviaría el navegador
+        radio = f"{grupo}:{0 if si else 1}"
+        if radio not in self.valores:
+            raise RuntimeError(f"❌ No existe el radio {radio}")
+        return self.parcial(grupo, "change", grupo, None, {grupo: self.valores[radio]})
+
+    # --- Pasos del flujo ---
+    def buscar(self, identificacion):
+        self.parcial("frmLegal:tipoDiscapacidad", "valueChange", "frmLegal:fldFiltro", "frmLegal:fldFiltro",
+                     {"frmLegal:tipoDiscapacidad_input": "I"})
+        parcial = self.parcial("frmLegal:j_idt83", ejecutar="@form", renderizar=FORMULARIO,
+                               valores={"frmLegal:tipoDiscapacidad_input": "I",
+                                        "frmLegal:j_idt81": identificacion})
+        encontrado = any(identificacion in leer_campos(html).textos
+                         or identificacion in html for html in parcial["actualizaciones"].values())
+        if not encontrado:
+            raise RuntimeError(f"❌ La búsqueda no devolvió la identificación {identificacion}")
+
+    def generar_acta(self, identificacion):
+        self.parcial("frmLegal:j_idt98:0:j_idt115", ejecutar="@this", renderizar=FORMULARIO)
+        if self.valores.get("frmLegal:identificacion") != identificacion:
+            raise RuntimeError(f"❌ El acta generada no corresponde a {identificacion}")
+
+    def seleccionar_causa(self, causa):
+        tabla = "frmLegal:j_idt374"
+        parcial = self.parcial(tabla, "rowSelect", tabla, tabla, {f"{tabla}_instantSelection": str(causa)})
+        html = parcial["actualizaciones"].get(tabla, "")
+        if not re.search(rf'aria-selected="true"[^>]*>\s*<td[^>]*>\s*{re.escape(str(causa))}\s*</td>', html):
+            raise RuntimeError(f"❌ La causa {causa} no quedó seleccionada")
+
+    def agregar_remuneracion(self, row):
+        if float(row['Salario_pendiente']) <= 0:
+            return False
+        self.parcial("frmLegal:j_idt574", ejecutar="@this", renderizar="frmLegal:dttRemu001")
+        self.seleccionar("frmLegal:dttRemu001:0:j_idt578", row['Mes'])
+        self.seleccionar("frmLegal:dttRemu001:0:j_idt580", row['Año'])
+        self.parcial("frmLegal:dttRemu001:0:btRemu000001", ejecutar="@this", renderizar="frmLegal:dlgRemu")
+        self.parcial("frmLegal:btnDlg003", ejecutar="frmLegal:dlgRemu", renderizar="frmLegal:dlgRemu",
+                     valores={campo: a_texto(row[columna]) for columna, campo in DIALOGO_REMUNERACION.items()})
+        return True
+
+    def procesar_fondo_reserva(self, row):
+        si = row['Fondo de reserva'] == "si"
+        self.elegir_radio("frmLegal:j_idt590", si)
+        if not si:
+            return
+        self.parcial("frmLegal:j_idt598", ejecutar="@this", renderizar="frmLegal:j_idt600")
+        self.seleccionar("frmLegal:j_idt600:0:j_idt602", row['Mes'])
+        self.seleccionar("frmLegal:j_idt600:0:j_idt604", row['Año'])
+        self.cambiar("frmLegal:j_idt600:0:j_idt607", row['Valor FR'])
+
+    def procesar_xiii(self, row):
+        si = row['XIII'] == "si"
+        self.elegir_radio("frmLegal:j_idt616", si)
+        if si:
+            fecha = row.get('Fecha XIII')
+            if fecha is not None and not pd.isna(fecha) and fecha != "":
+                self.parcial("frmLegal:fechaInicioD3", "dateSelect", "frmLegal:fechaInicioD3", None,
+                             {"frmLegal:fechaInicioD3_input": pd.Timestamp(fecha).strftime("%d/%m/%Y")})
+            if row.get('Obs XIII'):
+                self.cambiar("frmLegal:j_idt626", row['Obs XIII'])
+        total = row.get('Total_remuneracion_pendiente')
+        if not total or a_texto(total).strip() in ["", "0", "0.0", "nan"]:
+            return
+        self.parcial("frmLegal:j_idt1053", ejecutar="@this", renderizar="frmLegal:pnlIngreso0003")
+        calculado = calculo.a_monto(self.registrar_total_pendiente(total))
+        if not calculado:
+            raise RuntimeError("❌ El SUT no calculó la Décima Tercera")
+        calculo.verificar_xiii(calculado, float(calculo.decimo_tercero(total)))
+
+    def registrar_total_pendiente(self, total):
+        self.parcial("frmLegal:txtSueldo20257", "change", "frmLegal:txtSueldo20257", "frmLegal:pnlIngreso0003",
+                     {"frmLegal:txtSueldo20257": a_texto(total)})
+        return self.valores.get("frmLegal:txtSueldoDecimo00001", "")
+
+    def procesar_fila(self, row):
+        # Las mismas peticiones parciales, en el mismo orden, que autofill.procesar_fila
+        # en el navegador; row viene de validacion.validar
+        identificacion = str(row['Identificacion'])
+        self.abrir()
+        self.buscar(identificacion)
+        self.generar_acta(identificacion)
+        self.cambiar("frmLegal:remuneracion", row['Remuneracion'])
+        self.seleccionar_causa(row['Causa'])
+        self.agregar_remuneracion(row)
+        self.procesar_fondo_reserva(row)
+        self.procesar_xiii(row)
+        return identificacion
+
+# --- Varias sesiones HTTP concurrentes ---
+def procesar_concurrente(registros, sesiones, url=URL_FORMULARIO, hilos=8):
+    # Devuelve (identificacion, error, duracion) por registro a medida que terminan.
+    # sesiones es una lista de cookies, una sesión del SUT por hilo: dos hilos con la
+    # misma JSESSIONID comparten la vista JSF y se invalidan el ViewState. Sin
+    # sesiones (SUT local) cada hilo abre la suya.
+    if isinstance(sesiones, dict):
+        sesiones = [sesiones] if sesiones else []
+    if sesiones and hilos > len(sesiones):
+        print(f"⚠️ {hilos} hilos pero solo {len(sesiones)} sesiones del SUT: se usan {len(sesiones)} hilos")
+        hilos = len(sesiones)
+    libres = queue.Queue()
+    for cookies in sesiones or [{}] * hilos:
+        libres.put(cookies)
+    local = threading.local()
+
+    def _cliente():
+        # Un ClienteSUT (y su pool de conexiones) por hilo, reutilizado fila a fila
+        if not hasattr(local, "cliente"):
+            local.cliente = ClienteSUT(url, libres.get_nowait())
+        return local.cliente
+
+    def _procesar(row):
+        inicio = time.perf_counter()
+        try:
+            # Cada intento abre una vista nueva del formulario en la sesión del hilo
+            reintentos.ejecutar("http_fila", lambda: _cliente().procesar_fila(row), detalle=row['Identificacion'])
+            error = None
+        except Exception as e:
+            error = str(e)
+        return row['Identificacion'], error, time.perf_counter() - inicio
+
+    ejecutor = ThreadPoolExecutor(max_workers=hilos)
+    try:
+        futuros = [ejecutor.submit(_procesar, row) for row in registros]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+    finally:
+        # Si el lote se interrumpe no se empiezan las filas que quedaban en cola
+        ejecutor.shutdown(wait=True, cancel_futures=True)
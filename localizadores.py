@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+
+RUTA_LOCALIZADORES = r"autofill_sut\localizadores.json"
+
+# --- Nombres lógicos -> id generado por JSF ---
+# Cada entrada lleva el id conocido y una regla para volver a encontrarlo si el SUT
+# se redespliega y cambian los j_idt:
+#   ("etiqueta", texto)      input cuyo <label for> tiene ese texto
+#   ("boton", texto)         botón o enlace con ese texto
+#   ("menu", prefijo, n)     n-ésimo selectOneMenu cuyo id empieza con el prefijo
+#   ("campo", prefijo, n)    n-ésimo input de texto cuyo id empieza con el prefijo
+#   ("radio", n)             n-ésimo grupo de radios del formulario
+#   ("tabla_con", texto)     tabla que contiene un botón con ese texto
+LOCALIZADORES = {
+    "filtro_identificacion": ("frmLegal:j_idt81", ("etiqueta", "Identificación")),
+    "buscar": ("frmLegal:j_idt83", ("boton", "Buscar")),
+    "tabla_resultados": ("frmLegal:j_idt98", ("tabla_con", "Generar Acta Finiquito")),
+    "tabla_causas": ("frmLegal:j_idt374", None),
+    "agregar_remuneracion": ("frmLegal:j_idt574", ("boton", "Agregar remuneración")),
+    "mes_remuneracion": ("frmLegal:dttRemu001:0:j_idt578", ("menu", "frmLegal:dttRemu001:0:", 0)),
+    "anio_remuneracion": ("frmLegal:dttRemu001:0:j_idt580", ("menu", "frmLegal:dttRemu001:0:", 1)),
+    "fondo_reserva": ("frmLegal:j_idt590", ("radio", 0)),
+    "agregar_fondo_reserva": ("frmLegal:j_idt598", ("boton", "Agregar Fondo de Reserva")),
+    "mes_fondo_reserva": ("frmLegal:j_idt600:0:j_idt602", ("menu", "frmLegal:j_idt600:0:", 0)),
+    "anio_fondo_reserva": ("frmLegal:j_idt600:0:j_idt604", ("menu", "frmLegal:j_idt600:0:", 1)),
+    "valor_fondo_reserva": ("frmLegal:j_idt600:0:j_idt607", ("campo", "frmLegal:j_idt600:0:", 0)),
+    "decimo_tercero": ("frmLegal:j_idt616", ("radio", 1)),
+    "obs_decimo_tercero": ("frmLegal:j_idt626", ("etiqueta", "Observación")),
+    "registrar_ingreso": ("frmLegal:j_idt1053", ("boton", "Registrar Ingreso")),
+}
+
+# Contenedor donde vive cada nombre: las reglas solo buscan dentro de él y, si
+# todavía no está renderizado (ej. el panel del acta en la página de búsqueda),
+# el nombre queda sin resolver en lugar de tomar otro componente de la página.
+CONTENEDOR_BUSQUEDA = "frmLegal:fldFiltro"
+CONTENEDOR_ACTA = "frmLegal:pnlActa"
+CONTENEDORES = {
+    "filtro_identificacion": CONTENEDOR_BUSQUEDA,
+    "buscar": CONTENEDOR_BUSQUEDA,
+    "tabla_resultados": "frmLegal",
+}
+
+# Huella de la versión desplegada: recursos cargados y componentes del filtro de búsqueda
+_JS_HUELLA = """
+    var partes = [location.pathname];
+    document.querySelectorAll('script[src], link[href]').forEach(function (e) {
+        partes.push(e.getAttribute('src') || e.getAttribute('href'));
+    });
+    document.querySelectorAll('[id^="frmLegal:"]').forEach(function (e) {
+        if (e.id.indexOf('j_idt') >= 0 && !e.closest('[id="frmLegal:pnlActa"]')) { partes.push(e.id); }
+    });
+    return partes.join('|');
+"""
+
+# Resuelve un nombre dentro de su contenedor; null si el contenedor aún no tiene contenido
+_JS_RESOLVER = """
+    var defecto = arguments[0], regla = arguments[1], raiz = document.getElementById(arguments[2]);
+    if (!raiz || !raiz.children.length) { return null; }
+    var normal = function (t) {
+        return (t || '').normalize('NFD').replace(/[\\u0300-\\u036f]/g, '').trim().toLowerCase();
+    };
+    var existe = function (id) {
+        return !!(document.getElementById(id) || document.getElementById(id + '_input')
+                  || document.getElementById(id + ':0'));
+    };
+    if (existe(defecto)) { return defecto; }
+    var id = null;
+    if (regla && regla[0] === 'etiqueta') {
+        raiz.querySelectorAll('label[for]').forEach(function (l) {
+            if (!id && normal(l.textContent) === normal(regla[1])) { id = l.htmlFor; }
+        });
+    } else if (regla && regla[0] === 'boton') {
+        raiz.querySelectorAll('button[id], a[id]').forEach(function (b) {
+            if (!id && normal(b.textContent) === normal(regla[1])) { id = b.id; }
+        });
+    } else if (regla && regla[0] === 'tabla_con') {
+        raiz.querySelectorAll('button[id], a[id]').forEach(function (b) {
+            var tabla = b.closest('table[id]');
+            if (!id && tabla && normal(b.textContent) === normal(regla[1])) { id = tabla.id; }
+        });
+    } else if (regla && regla[0] === 'menu') {
+        var menus = Array.from(raiz.querySelectorAll('.ui-selectonemenu[id]'))
+            .filter(function (m) { return m.id.indexOf(regla[1]) === 0; });
+        if (menus[regla[2]]) { id = menus[regla[2]].id; }
+    } else if (regla && regla[0] === 'campo') {
+        var campos = Array.from(raiz.querySelectorAll('input[type=text][id]'))
+            .filter(function (c) { return c.id.indexOf(regla[1]) === 0; });
+        if (campos[regla[2]]) { id = campos[regla[2]].id; }
+    } else if (regla && regla[0] === 'radio') {
+        var grupos = [];
+        raiz.querySelectorAll('input[type=radio][name]').forEach(function (r) {
+            if (grupos.indexOf(r.name) < 0) { grupos.push(r.name); }
+        });
+        if (grupos[regla[1]]) { id = grupos[regla[1]]; }
+    }
+    return id;
+"""
+
+_JS_CAUSAS = """
+    var cuerpo = document.getElementById(arguments[0] + '_data');
+    if (!cuerpo) { return null; }
+    var causas = {};
+    for (var i = 0; i < cuerpo.rows.length; i++) {
+        var celda = cuerpo.rows[i].cells[0];
+        if (celda) { causas[celda.textContent.trim()] = i; }
+    }
+    return causas;
+"""
+
+_JS_FILA_CAUSA = """
+    var cuerpo = document.getElementById(arguments[0] + '_data');
+    var fila = cuerpo ? cuerpo.rows[arguments[1]] : null;
+    if (fila && fila.cells[0] && fila.cells[0].textContent.trim() === arguments[2]) { return fila; }
+    return null;
+"""
+
+# --- Índice de localizadores con caché en disco ---
+class IndiceLocalizadores:
+    def __init__(self, ruta=RUTA_LOCALIZADORES):
+        self.ruta = ruta
+        self.huella = None
+        self.ids = {}
+        self.causas = {}
+        self._cache = {}
+        if ruta and os.path.exists(ruta):
+            try:
+                with open(ruta, encoding="utf-8") as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+
+    def al_cargar(self, driver):
+        # Se llama en cada carga completa del formulario; si la huella cambió
+        # (redespliegue del SUT) se empieza con un índice vacío.
+        huella = hashlib.sha1(driver.execute_script(_JS_HUELLA).encode("utf-8")).hexdigest()
+        if huella == self.huella:
+            return
+        self.huella = huella
+        guardado = self._cache.get(huella, {})
+        self.ids = dict(guardado.get("ids", {}))
+        self.causas = dict(guardado.get("causas", {}))
+
+    def _guardar(self):
+        if not self.ruta or not self.huella:
+            return
+        self._cache[self.huella] = {"ids": self.ids, "causas": self.causas}
+        # Los trabajadores de paralelo.py comparten el archivo: se escribe aparte y se reemplaza
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f, ensure_ascii=False, indent=2)
+            os.replace(temporal, self.ruta)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la caché de localizadores: {e}")
+
+    def resolver(self, driver, nombre):
+        # Solo se guarda lo encontrado con el contenedor del nombre ya renderizado
+        defecto, regla = LOCALIZADORES[nombre]
+        contenedor = CONTENEDORES.get(nombre, CONTENEDOR_ACTA)
+        encontrado = driver.execute_script(_JS_RESOLVER, defecto, list(regla) if regla else None, contenedor)
+        if encontrado:
+            self.ids[nombre] = encontrado
+            self._guardar()
+        return encontrado
+
+    def id(self, driver, nombre):
+        if nombre not in LOCALIZADORES:
+            return nombre
+        if nombre not in self.ids:
+            return self.resolver(driver, nombre) or LOCALIZADORES[nombre][0]
+        return self.ids[nombre]
+
+    def fila_causa(self, driver, causa):
+        causa = str(causa).strip()
+        tabla = self.id(driver, "tabla_causas")
+        if causa not in self.causas:
+            self.causas = driver.execute_script(_JS_CAUSAS, tabla) or {}
+            self._guardar()
+        if causa not in self.causas:
+            return None
+        fila = driver.execute_script(_JS_FILA_CAUSA, tabla, self.causas[causa], causa)
+        if fila is None:
+            # La tabla cambió desde que se armó el índice: se reconstruye una vez
+            self.causas = driver.execute_script(_JS_CAUSAS, tabla) or {}
+            self._guardar()
+            if causa in self.causas:
+                fila = driver.execute_script(_JS_FILA_CAUSA, tabla, self.causas[causa], causa)
+        return fila
+
+    def invalidar(self):
+        self.ids = {}
+        self.causas = {}
+        self._guardar()
+
+# --- Índice activo del proceso ---
+_activo = None
+
+def activar(indice):
+    global _activo
+    _activo = indice
+    return indice
+
+def actual():
+    global _activo
+    if _activo is None:
+        _activo = IndiceLocalizadores(None)
+    return _activo
+
+def ubicar(driver, nombre):
+    return actual().id(driver, nombre)
@@ -0,0 +1,496 @@
+import argparse
+import html
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+# Réplica local de registroActaFrm.xhtml para medir el script sin tocar el SUT real.
+# Reproduce los ids frmLegal:* que usa autofill.py, la tabla de causas, los radios
+# de FR/XIII, el datepicker y el cálculo de txtSueldoDecimo00001 en el servidor.
+
+RUTA = "/mrl/empresa/actas/registroActaFrm.xhtml"
+RUTA_ACTAS = "/mrl/empresa/actas/listaActas.xhtml"
+TABLA_ACTAS = "frmActas:dtActas"
+FILAS_POR_PAGINA = 100
+VIEWSTATE_ID = "j_id1:javax.faces.ViewState:0"
+
+CAUSAS = {
+    "1": "Terminación por acuerdo de las partes",
+    "2": "Conclusión de la obra o servicio",
+    "3": "Muerte o incapacidad del empleador",
+    "4": "Muerte del trabajador",
+    "5": "Caso fortuito o fuerza mayor",
+    "6": "Visto bueno solicitado por el empleador",
+    "7": "Visto bueno solicitado por el trabajador",
+    "8": "Desahucio",
+    "9": "Despido intempestivo",
+    "10": "Terminación del periodo de prueba",
+}
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio",
+         "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+ANIOS = [str(a) for a in range(2020, 2031)]
+
+# --- Estado por sesión (JSESSIONID) ---
+class Estado:
+    def __init__(self):
+        self.viewstate = uuid.uuid4().hex
+        self.valores = {}
+        self.buscado = None
+        self.acta = None
+        self.causa = None
+        self.remuneracion = False
+        self.dialogo = False
+        self.fondo_reserva = False
+        self.ingreso = False
+
+_sesiones = {}
+_candado = threading.Lock()
+# Actas generadas en cualquier sesión, en orden: las lista listaActas.xhtml
+_actas = []
+
+def _v(estado, campo, defecto=""):
+    return html.escape(estado.valores.get(campo, defecto), quote=True)
+
+# --- Fragmentos HTML (mismos ids que el SUT) ---
+def _menu(estado, menu_id, opciones):
+    seleccionado = estado.valores.get(f"{menu_id}_input", opciones[0])
+    opts = "".join(
+        f'<option value="{html.escape(o)}"{" selected" if o == seleccionado else ""}>{html.escape(o)}</option>'
+        for o in opciones
+    )
+    items = "".join(f'<li class="ui-selectonemenu-item" data-label="{html.escape(o)}">{html.escape(o)}</li>'
+                    for o in opciones)
+    return (f'<div id="{menu_id}" class="ui-selectonemenu">'
+            f'<select id="{menu_id}_input" name="{menu_id}_input" style="display:none">{opts}</select>'
+            f'<label id="{menu_id}_label" class="ui-selectonemenu-label">{html.escape(seleccionado)}</label>'
+            f'<div id="{menu_id}_panel" class="ui-selectonemenu-panel" style="display:none">'
+            f'<ul id="{menu_id}_items">{items}</ul></div></div>')
+
+def _boton(boton_id, texto, actualizar, procesar="@this"):
+    return (f'<button id="{boton_id}" name="{boton_id}" type="button" '
+            f'onclick="PrimeFaces.ab({{s:this.id,p:\'{procesar}\',u:\'{actualizar}\'}});return false;">'
+            f'{html.escape(texto)}</button>')
+
+def _radio(radio_id, nombre, valor, texto):
+    return (f'<div class="ui-radiobutton"><input type="radio" id="{radio_id}" name="{nombre}" value="{valor}"/>'
+            f'<div class="ui-radiobutton-box"><span class="ui-radiobutton-icon ui-icon-blank"></span></div>'
+            f'<label for="{radio_id}">{texto}</label></div>')
+
+def render_filtro(estado):
+    oculto = ' style="display:none"' if estado.acta else ""
+    tipo = estado.valores.get("frmLegal:tipoDiscapacidad_input", "")
+    return (f'<fieldset id="frmLegal:fldFiltro"{oculto}>'
+            f'<div id="frmLegal:tipoDiscapacidad"><select id="frmLegal:tipoDiscapacidad_input" '
+            f'name="frmLegal:tipoDiscapacidad_input">'
+            f'<option value="">Seleccione</option>'
+            f'<option value="I"{" selected" if tipo == "I" else ""}>Identificación</option></select></div>'
+            f'<label for="frmLegal:j_idt81">Identificación</label>'
+            f'<input id="frmLegal:j_idt81" name="frmLegal:j_idt81" type="text" value="{_v(estado, "frmLegal:j_idt81")}"/>'
+            + _boton("frmLegal:j_idt83", "Buscar", "frmLegal:pnlResultados", "@form") +
+            '</fieldset>')
+
+def render_resultados(estado):
+    filas = ""
+    if estado.buscado and not estado.acta:
+        filas = (f'<tr><td>{html.escape(estado.buscado)}</td><td>'
+                 + _boton("frmLegal:j_idt98:0:j_idt115", "Generar Acta Finiquito",
+                          "frmLegal:fldFiltro frmLegal:pnlResultados frmLegal:pnlActa")
+                 + '</td></tr>')
+    return (f'<div id="frmLegal:pnlResultados"><table id="frmLegal:j_idt98">'
+            f'<tbody id="frmLegal:j_idt98_data">{filas}</tbody></table></div>')
+
+def render_causas(estado):
+    filas = "".join(
+        f'<tr data-ri="{i}" aria-selected="{"true" if estado.causa == num else "false"}" '
+        f'onclick="PrimeFaces.ab({{s:\'frmLegal:j_idt374\',e:\'rowSelect\',p:\'frmLegal:j_idt374\','
+        f'u:\'frmLegal:j_idt374\',pa:[{{name:\'frmLegal:j_idt374_instantSelection\',value:\'{num}\'}}]}});">'
+        f'<td>{num}</td><td>{html.escape(texto)}</td></tr>'
+        for i, (num, texto) in enumerate(CAUSAS.items())
+    )
+    return f'<div id="frmLegal:j_idt374"><table><tbody id="frmLegal:j_idt374_data">{filas}</tbody></table></div>'
+
+def render_remuneraciones(estado):
+    contenido = ""
+    if estado.remuneracion:
+        contenido = (
+            '<table><tbody id="frmLegal:dttRemu001_data"><tr><td>'
+            + _menu(estado, "frmLegal:dttRemu001:0:j_idt578", MESES) + '</td><td>'
+            + _menu(estado, "frmLegal:dttRemu001:0:j_idt580", ANIOS) + '</td><td>'
+            + _boton("frmLegal:dttRemu001:0:btRemu000001", "Detalle", "frmLegal:dlgRemu")
+            + '</td></tr></tbody></table>'
+        )
+    return f'<div id="frmLegal:dttRemu001">{contenido}</div>'
+
+def render_dialogo(estado):
+    if not estado.dialogo:
+        return '<div id="frmLegal:dlgRemu"></div>'
+    campos = "".join(
+        f'<label for="{c}">{c}</label><input id="{c}" name="{c}" type="text" value="{_v(estado, c)}"/>'
+        for c in ["frmLegal:txtDlg001", "frmLegal:txtDlg0012", "frmLegal:txtDlg002",
+                  "frmLegal:txtDlg004", "frmLegal:txtDlg004n"]
+    )
+    return (f'<div id="frmLegal:dlgRemu" class="ui-dialog">{campos}'
+            + _boton("frmLegal:btnDlg003", "Guardar", "frmLegal:dlgRemu", "frmLegal:dlgRemu") + '</div>')
+
+def render_fondo_reserva(estado):
+    contenido = ""
+    if estado.fondo_reserva:
+        contenido = (
+            '<table><tbody><tr><td>'
+            + _menu(estado, "frmLegal:j_idt600:0:j_idt602", MESES) + '</td><td>'
+            + _menu(estado, "frmLegal:j_idt600:0:j_idt604", ANIOS) + '</td><td>'
+            + f'<input id="frmLegal:j_idt600:0:j_idt607" name="frmLegal:j_idt600:0:j_idt607" type="text" '
+              f'value="{_v(estado, "frmLegal:j_idt600:0:j_idt607")}"/>'
+            + '</td></tr></tbody></table>'
+        )
+    return f'<div id="frmLegal:j_idt600">{contenido}</div>'
+
+def render_ingreso(estado):
+    deshabilitado = "" if estado.ingreso else " disabled"
+    return (f'<div id="frmLegal:pnlIngreso0003">'
+            f'<label for="frmLegal:txtSueldo20257">Total remuneración</label>'
+            f'<input id="frmLegal:txtSueldo20257" name="frmLegal:txtSueldo20257" type="text"{deshabilitado} '
+            f'value="{_v(estado, "frmLegal:txtSueldo20257")}"/>'
+            f'<label for="frmLegal:txtSueldoDecimo00001">Décima tercera</label>'
+            f'<input id="frmLegal:txtSueldoDecimo00001" name="frmLegal:txtSueldoDecimo00001" type="text" readonly '
+            f'value="{_v(estado, "frmLegal:txtSueldoDecimo00001", "0")}"/></div>')
+
+def render_acta(estado):
+    if not estado.acta:
+        return '<div id="frmLegal:pnlActa"></div>'
+    return (
+        '<div id="frmLegal:pnlActa">'
+        f'<label for="frmLegal:identificacion">Identificación</label>'
+        f'<input id="frmLegal:identificacion" name="frmLegal:identificacion" type="text" readonly '
+        f'value="{html.escape(estado.acta)}"/>'
+        f'<label for="frmLegal:remuneracion">Remuneración</label>'
+        f'<input id="frmLegal:remuneracion" name="frmLegal:remuneracion" type="text" '
+        f'value="{_v(estado, "frmLegal:remuneracion")}"/>'
+        + render_causas(estado)
+        + _boton("frmLegal:j_idt574", "Agregar remuneración", "frmLegal:dttRemu001")
+        + render_remuneraciones(estado) + render_dialogo(estado)
+        + '<div id="frmLegal:j_idt590">'
+        + _radio("frmLegal:j_idt590:0", "frmLegal:j_idt590", "S", "Sí")
+        + _radio("frmLegal:j_idt590:1", "frmLegal:j_idt590", "N", "No") + '</div>'
+        + _boton("frmLegal:j_idt598", "Agregar Fondo de Reserva", "frmLegal:j_idt600")
+        + render_fondo_reserva(estado)
+        + '<div id="frmLegal:j_idt616">'
+        + _radio("frmLegal:j_idt616:0", "frmLegal:j_idt616", "S", "Sí")
+        + _radio("frmLegal:j_idt616:1", "frmLegal:j_idt616", "N", "No") + '</div>'
+        + '<div id="frmLegal:dgrDCR0003"><span>Décima Tercera</span>'
+        + f'<input id="frmLegal:fechaInicioD3_input" name="frmLegal:fechaInicioD3_input" type="text" '
+          f'value="{_v(estado, "frmLegal:fechaInicioD3_input")}"/>'
+        + '<button type="button" class="ui-datepicker-trigger" '
+          'onclick="abrirCalendario(\'frmLegal:fechaInicioD3_input\');">...</button>'
+        + '<label for="frmLegal:j_idt626">Observación</label>'
+        + f'<input id="frmLegal:j_idt626" name="frmLegal:j_idt626" type="text" value="{_v(estado, "frmLegal:j_idt626")}"/>'
+        + '</div>'
+        + _boton("frmLegal:j_idt1053", "Registrar Ingreso", "frmLegal:pnlIngreso0003")
+        + render_ingreso(estado)
+        + '</div>'
+    )
+
+_RENDER = {
+    "frmLegal:fldFiltro": render_filtro,
+    "frmLegal:pnlResultados": render_resultados,
+    "frmLegal:pnlActa": render_acta,
+    "frmLegal:j_idt374": render_causas,
+    "frmLegal:dttRemu001": render_remuneraciones,
+    "frmLegal:dlgRemu": render_dialogo,
+    "frmLegal:j_idt600": render_fondo_reserva,
+    "frmLegal:pnlIngreso0003": render_ingreso,
+}
+
+# Stub mínimo de PrimeFaces/jQuery: cola AJAX, PrimeFaces.ab, widgets selectOneMenu y datepicker
+_JS = r"""
+window.jQuery = { active: 0 };
+window.PrimeFaces = {
+    widgets: {},
+    ajax: { Queue: { requests: [], isEmpty: function () { return this.requests.length === 0; } } },
+    ab: function (cfg) {
+        var datos = new URLSearchParams(new FormData(document.getElementById('frmLegal')));
+        datos.set('javax.faces.partial.ajax', 'true');
+        datos.set('javax.faces.source', cfg.s);
+        datos.set('javax.faces.partial.execute', cfg.p || cfg.s);
+        if (cfg.u) { datos.set('javax.faces.partial.render', cfg.u); }
+        if (cfg.e) { datos.set('javax.faces.behavior.event', cfg.e); } else { datos.set(cfg.s, cfg.s); }
+        (cfg.pa || []).forEach(function (p) { datos.set(p.name, p.value); });
+        var xhr = new XMLHttpRequest();
+        var cola = PrimeFaces.ajax.Queue.requests;
+        cola.push(xhr);
+        jQuery.active++;
+        xhr.open('POST', location.pathname);
+        xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+        xhr.setRequestHeader('Faces-Request', 'partial/ajax');
+        xhr.onloadend = function () {
+            try { aplicarRespuesta(xhr.responseXML); }
+            finally { cola.splice(cola.indexOf(xhr), 1); jQuery.active--; }
+        };
+        xhr.send(datos.toString());
+    }
+};
+function aplicarRespuesta(doc) {
+    if (!doc) { return; }
+    var updates = doc.getElementsByTagName('update');
+    for (var i = 0; i < updates.length; i++) {
+        var id = updates[i].getAttribute('id');
+        var contenido = updates[i].textContent;
+        if (id.indexOf('javax.faces.ViewState') >= 0) {
+            document.getElementsByName('javax.faces.ViewState')[0].value = contenido;
+            continue;
+        }
+        var el = document.getElementById(id);
+        if (el) { el.outerHTML = contenido; }
+    }
+    registrarWidgets();
+}
+function registrarWidgets() {
+    document.querySelectorAll('.ui-selectonemenu').forEach(function (div) {
+        var id = div.id;
+        var widget = {
+            id: id,
+            selectValue: function (valor) {
+                var select = document.getElementById(id + '_input');
+                select.value = valor;
+                document.getElementById(id + '_label').textContent = select.options[select.selectedIndex].text;
+                document.getElementById(id + '_panel').style.display = 'none';
+                PrimeFaces.ab({ s: id, e: 'change', p: id, u: id });
+            }
+        };
+        PrimeFaces.widgets['widget_' + id.replace(/:/g, '_')] = widget;
+        document.getElementById(id + '_label').onclick = function () {
+            var panel = document.getElementById(id + '_panel');
+            panel.style.display = panel.style.display === 'none' ? 'block' : 'none';
+        };
+        div.querySelectorAll('li').forEach(function (li) {
+            li.onclick = function () { widget.selectValue(li.getAttribute('data-label')); };
+        });
+    });
+}
+var MESES_CORTOS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+function abrirCalendario(inputId) {
+    var div = document.getElementById('ui-datepicker-div');
+    div.setAttribute('data-input', inputId);
+    var anios = '', meses = '';
+    for (var a = 2015; a <= 2030; a++) { anios += '<option value="' + a + '">' + a + '</option>'; }
+    MESES_CORTOS.forEach(function (m, i) { meses += '<option value="' + i + '">' + m + '</option>'; });
+    div.innerHTML = '<select class="ui-datepicker-month" onchange="pintarDias()">' + meses + '</select>' +
+        '<select class="ui-datepicker-year" onchange="pintarDias()">' + anios + '</select><table id="dp-dias"></table>';
+    var hoy = new Date();
+    div.querySelector('.ui-datepicker-month').value = hoy.getMonth();
+    div.querySelector('.ui-datepicker-year').value = hoy.getFullYear();
+    div.style.display = 'block';
+    pintarDias();
+}
+function pintarDias() {
+    var div = document.getElementById('ui-datepicker-div');
+    var mes = parseInt(div.querySelector('.ui-datepicker-month').value, 10);
+    var anio = parseInt(div.querySelector('.ui-datepicker-year').value, 10);
+    var dias = new Date(anio, mes + 1, 0).getDate();
+    var html = '<tr>';
+    for (var d = 1; d <= dias; d++) {
+        html += '<td data-handler="selectDay" data-month="' + mes + '" data-year="' + anio + '">' +
+            '<a href="#" onclick="elegirDia(' + d + ',' + mes + ',' + anio + ');return false;">' + d + '</a></td>';
+        if (d % 7 === 0) { html += '</tr><tr>'; }
+    }
+    div.querySelector('#dp-dias').innerHTML = html + '</tr>';
+}
+function elegirDia(d, m, a) {
+    var div = document.getElementById('ui-datepicker-div');
+    var dd = ('0' + d).slice(-2), mm = ('0' + (m + 1)).slice(-2);
+    document.getElementById(div.getAttribute('data-input')).value = dd + '/' + mm + '/' + a;
+    div.style.display = 'none';
+}
+document.addEventListener('DOMContentLoaded', registrarWidgets);
+"""
+
+def render_pagina(estado):
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>SUT local</title>'
+        f'<script>{_JS}</script></head><body>'
+        f'<form id="frmLegal" name="frmLegal" method="post" action="{RUTA}" onsubmit="return false;">'
+        '<input type="hidden" name="frmLegal" value="frmLegal"/>'
+        + render_filtro(estado) + render_resultados(estado) + render_acta(estado)
+        + f'<input type="hidden" name="javax.faces.ViewState" id="{VIEWSTATE_ID}" value="{estado.viewstate}"/>'
+        '</form><div id="ui-datepicker-div" style="display:none"></div></body></html>'
+    )
+
+def _respuesta_parcial(actualizaciones, estado, error=None):
+    partes = ['<?xml version="1.0" encoding="UTF-8"?><partial-response id="j_id1">']
+    if error:
+        partes.append(f'<error><error-name>{error[0]}</error-name>'
+                      f'<error-message><![CDATA[{error[1]}]]></error-message></error>')
+    else:
+        partes.append("<changes>")
+        for componente_id in actualizaciones:
+            partes.append(f'<update id="{componente_id}"><![CDATA[{_RENDER[componente_id](estado)}]]></update>')
+        partes.append(f'<update id="{VIEWSTATE_ID}"><![CDATA[{estado.viewstate}]]></update></changes>')
+    partes.append("</partial-response>")
+    return "".join(partes)
+
+# --- Lógica del servidor para cada petición parcial ---
+def atender_parcial(estado, datos):
+    fuente = datos.get("javax.faces.source", "")
+    for nombre, valor in datos.items():
+        if nombre.startswith("frmLegal:"):
+            estado.valores[nombre] = valor
+
+    if fuente == "frmLegal:j_idt83":
+        estado.buscado = datos.get("frmLegal:j_idt81", "").strip() or None
+        return ["frmLegal:pnlResultados"]
+    if fuente == "frmLegal:j_idt98:0:j_idt115":
+        estado.acta = estado.buscado
+        with _candado:
+            if estado.acta not in _actas:
+                _actas.append(estado.acta)
+        return ["frmLegal:fldFiltro", "frmLegal:pnlResultados", "frmLegal:pnlActa"]
+    if fuente == "frmLegal:j_idt374":
+        estado.causa = datos.get("frmLegal:j_idt374_instantSelection")
+        return ["frmLegal:j_idt374"]
+    if fuente == "frmLegal:j_idt574":
+        estado.remuneracion = True
+        return ["frmLegal:dttRemu001"]
+    if fuente == "frmLegal:dttRemu001:0:btRemu000001":
+        estado.dialogo = True
+        return ["frmLegal:dlgRemu"]
+    if fuente == "frmLegal:btnDlg003":
+        estado.dialogo = False
+        return ["frmLegal:dlgRemu"]
+    if fuente == "frmLegal:j_idt598":
+        estado.fondo_reserva = True
+        return ["frmLegal:j_idt600"]
+    if fuente == "frmLegal:j_idt1053":
+        estado.ingreso = True
+        return ["frmLegal:pnlIngreso0003"]
+    if fuente == "frmLegal:txtSueldo20257":
+        try:
+            total = float(datos.get("frmLegal:txtSueldo20257", "0").replace(",", "."))
+        except ValueError:
+            total = 0.0
+        estado.valores["frmLegal:txtSueldoDecimo00001"] = f"{total / 12:.2f}"
+        return ["frmLegal:pnlIngreso0003"]
+    if fuente == "frmLegal:tipoDiscapacidad":
+        return ["frmLegal:fldFiltro"]
+    return []
+
+# --- Listado de actas registradas (datatable paginado) ---
+def render_filas_actas(primera, filas):
+    with _candado:
+        pagina = _actas[primera:primera + filas]
+    return "".join(
+        f'<tr data-ri="{primera + i}"><td>{primera + i + 1}</td><td>{html.escape(ident)}</td>'
+        f'<td>Acta de finiquito</td><td>Registrada</td></tr>'
+        for i, ident in enumerate(pagina)
+    )
+
+def render_listado(estado):
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Actas registradas</title></head><body>'
+        f'<form id="frmActas" name="frmActas" method="post" action="{RUTA_ACTAS}">'
+        '<input type="hidden" name="frmActas" value="frmActas"/>'
+        f'<div id="{TABLA_ACTAS}" class="ui-datatable"><table><thead><tr><th>N°</th><th>Identificación</th>'
+        f'<th>Tipo</th><th>Estado</th></tr></thead><tbody id="{TABLA_ACTAS}_data">'
+        + render_filas_actas(0, FILAS_POR_PAGINA) + '</tbody></table></div>'
+        + f'<input type="hidden" name="javax.faces.ViewState" id="{VIEWSTATE_ID}" value="{estado.viewstate}"/>'
+        '</form></body></html>'
+    )
+
+def atender_paginacion(estado, datos):
+    # Como un p:dataTable paginado: el servidor limita las filas por página
+    try:
+        primera = int(datos.get(f"{TABLA_ACTAS}_first", "0"))
+        filas = min(int(datos.get(f"{TABLA_ACTAS}_rows", FILAS_POR_PAGINA)), FILAS_POR_PAGINA)
+    except ValueError:
+        primera, filas = 0, FILAS_POR_PAGINA
+    return ('<?xml version="1.0" encoding="UTF-8"?><partial-response id="j_id1"><changes>'
+            f'<update id="{TABLA_ACTAS}"><![CDATA[{render_filas_actas(primera, filas)}]]></update>'
+            f'<update id="{VIEWSTATE_ID}"><![CDATA[{estado.viewstate}]]></update>'
+            '</changes></partial-response>')
+
+class ManejadorSUT(BaseHTTPRequestHandler):
+    latencia = 0.0
+    jitter = 0.0
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _esperar(self):
+        demora = self.latencia + random.uniform(-self.jitter, self.jitter)
+        if demora > 0:
+            time.sleep(demora)
+
+    def _sesion(self):
+        cookies = dict(
+            parte.strip().split("=", 1) for parte in self.headers.get("Cookie", "").split(";") if "=" in parte
+        )
+        sesion_id = cookies.get("JSESSIONID")
+        nueva = sesion_id is None
+        if nueva:
+            sesion_id = uuid.uuid4().hex
+        return sesion_id, nueva
+
+    def _enviar(self, cuerpo, tipo, sesion_id=None):
+        datos = cuerpo.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{tipo}; charset=UTF-8")
+        self.send_header("Content-Length", str(len(datos)))
+        if sesion_id:
+            self.send_header("Set-Cookie", f"JSESSIONID={sesion_id}; Path=/")
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        ruta = self.path.split("?")[0]
+        if ruta not in (RUTA, RUTA_ACTAS):
+            self.send_error(404)
+            return
+        self._esperar()
+        sesion_id, _ = self._sesion()
+        estado = Estado()
+        with _candado:
+            _sesiones[sesion_id] = estado
+        pagina = render_listado(estado) if ruta == RUTA_ACTAS else render_pagina(estado)
+        self._enviar(pagina, "text/html", sesion_id)
+
+    def do_POST(self):
+        largo = int(self.headers.get("Content-Length", 0))
+        datos = dict(parse_qsl(self.rfile.read(largo).decode("utf-8"), keep_blank_values=True))
+        self._esperar()
+        sesion_id, _ = self._sesion()
+        with _candado:
+            estado = _sesiones.get(sesion_id)
+        if estado is None or datos.get("javax.faces.ViewState") != estado.viewstate:
+            xml = _respuesta_parcial([], estado or Estado(),
+                                     ("javax.faces.application.ViewExpiredException", "Vista expirada"))
+        elif datos.get("javax.faces.source") == TABLA_ACTAS:
+            xml = atender_paginacion(estado, datos)
+        else:
+            xml = _respuesta_parcial(atender_parcial(estado, datos), estado)
+        self._enviar(xml, "text/xml")
+
+def iniciar_servidor(puerto=0, latencia=0.0, jitter=0.0):
+    # Devuelve (servidor, url); el servidor corre en un hilo en segundo plano
+    manejador = type("Manejador", (ManejadorSUT,), {"latencia": latencia, "jitter": jitter})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}{RUTA}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SUT local de pruebas para registroActaFrm.xhtml")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--latencia", type=float, default=0.2, help="Latencia del servidor por petición (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Variación aleatoria de la latencia (± s)")
+    args = parser.parse_args(argv)
+
+    servidor, url = iniciar_servidor(args.puerto, args.latencia, args.jitter)
+    print(f"🧪 SUT local escuchando en {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import multiprocessing as mp
+import os
+import queue
+import subprocess
+import time
+import urllib.request
+
+import autofill
+import bitacora as bitacora_mod
+import localizadores
+import reintentos
+import trazas
+from salud import MonitorSalud
+from trazas import tramo
+
+# --- Lanzar instancias de Chrome con perfiles separados ---
+def lanzar_chrome(puerto, perfil, chrome="chrome"):
+    # Cada perfil mantiene su propia sesión del SUT; la primera vez hay que
+    # iniciar sesión manualmente en cada ventana.
+    os.makedirs(perfil, exist_ok=True)
+    return subprocess.Popen([
+        chrome,
+        f"--remote-debugging-port={puerto}",
+        f"--user-data-dir={perfil}",
+        autofill.URL_FORMULARIO,
+    ])
+
+def esperar_chrome(puerto, timeout=30, intervalo=0.2):
+    # Sondea el endpoint de DevTools hasta que el Chrome recién lanzado responde
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/json/version", timeout=1):
+                return True
+        except OSError:
+            time.sleep(intervalo)
+    print(f"⚠️ El Chrome del puerto {puerto} no respondió en {timeout} s")
+    return False
+
+# --- Trabajador: un proceso, un driver ---
+def _trabajador(puerto, tareas, resultados, url=autofill.URL_FORMULARIO, politica=None, ruta_localizadores=None,
+                limites=None):
+    # Con spawn el proceso no hereda la configuración del coordinador: se repite aquí
+    if politica:
+        reintentos.configurar(politica)
+    localizadores.activar(localizadores.IndiceLocalizadores(ruta_localizadores))
+    traza = trazas.activar(trazas.Traza())
+    def _conectar():
+        return traza.instrumentar(autofill.conectar_driver(f"127.0.0.1:{puerto}"))
+    salud = MonitorSalud(_conectar, lambda d: autofill.cargar_formulario(d, url), **(limites or {}))
+    try:
+        driver = _conectar()
+    except Exception as e:
+        print(f"❌ [{puerto}] No se pudo conectar al Chrome: {e}")
+        return
+
+    try:
+        autofill.cargar_formulario(driver, url)
+        primera = True
+        while True:
+            tarea = tareas.get()
+            if tarea is None:
+                break
+            indice, registro = tarea
+            traza.iniciar_fila(registro['Identificacion'])
+            inicio_fila = time.perf_counter()
+            error = None
+            try:
+                with tramo("fila"):
+                    if not primera:
+                        with tramo("volver_a_busqueda"):
+                            autofill.volver_a_busqueda(driver, url=url)
+                    primera = False
+                    autofill.procesar_fila(driver, registro)
+            except Exception as e:
+                error = str(e)
+            duracion = time.perf_counter() - inicio_fila
+            # Los tramos viajan con el resultado y el coordinador los consolida
+            resultados.put((indice, registro['Identificacion'], error, duracion, puerto, traza.cerrar_fila()))
+            driver = salud.despues_de_fila(driver, duracion)
+    finally:
+        salud.imprimir_resumen()
+        driver.quit()
+
+# --- Coordinador: reparte filas y consolida resultados ---
+def procesar_en_paralelo(df_datos, puertos, bitacora, limite=None, traza=None, url=autofill.URL_FORMULARIO,
+                         politica=None, ruta_localizadores=None, limites=None):
+    pendientes = bitacora.pendientes(df_datos)
+    # Una identificación nunca se envía dos veces aunque esté repetida en el Excel
+    pendientes = pendientes.drop_duplicates(subset='Identificacion', keep='first')
+    if limite is not None:
+        pendientes = pendientes.head(limite)
+    if pendientes.empty:
+        print("❌ No hay registros pendientes para procesar")
+        return
+
+    ctx = mp.get_context("spawn")
+    tareas = ctx.Queue()
+    resultados = ctx.Queue()
+    for indice, row in pendientes.iterrows():
+        tareas.put((indice, row.to_dict()))
+    for _ in puertos:
+        tareas.put(None)
+
+    procesos = [
+        ctx.Process(target=_trabajador, args=(puerto, tareas, resultados, url, politica, ruta_localizadores, limites),
+                    daemon=True)
+        for puerto in puertos
+    ]
+    inicio_lote = time.perf_counter()
+    for p in procesos:
+        p.start()
+
+    traza = traza or trazas.actual() or trazas.activar(trazas.Traza())
+    duraciones = []
+    procesadas = fallidas = 0
+    esperadas = len(pendientes)
+    while procesadas + fallidas < esperadas:
+        try:
+            indice, identificacion, error, duracion, puerto, tramos = resultados.get(timeout=1)
+        except queue.Empty:
+            if not any(p.is_alive() for p in procesos):
+                print("⚠️ Todos los trabajadores terminaron antes de completar el lote")
+                break
+            continue
+
+        duraciones.append(duracion)
+
+        # --- Marcar fila (solo el coordinador escribe la bitácora y la traza) ---
+        traza.agregar(tramos)
+        traza.iniciar_fila(identificacion)
+        with tramo("escritura"):
+            bitacora.registrar(identificacion, bitacora_mod.ERROR if error else bitacora_mod.ENVIADO, error)
+        traza.cerrar_fila()
+        if error:
+            fallidas += 1
+            print(f"❌ [{puerto}] Error procesando identificación {identificacion}: {error}")
+        else:
+            procesadas += 1
+            print(f"✅ [{puerto}] Registro con Identificación {identificacion} procesado")
+
+    for p in procesos:
+        p.join(timeout=5)
+
+    return autofill.imprimir_resumen(duraciones, time.perf_counter() - inicio_lote, procesadas, fallidas)
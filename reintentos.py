@@ -0,0 +1,199 @@
+import json
+import random
+import threading
+import time
+
+import trazas
+
+# --- Política por paso: backoff exponencial con jitter y presupuesto de tiempo ---
+class Politica:
+    def __init__(self, intentos=3, base=0.25, factor=2.0, maximo=5.0, jitter=0.5, presupuesto=None):
+        self.intentos = intentos
+        self.base = base
+        self.factor = factor
+        self.maximo = maximo
+        self.jitter = jitter
+        self.presupuesto = presupuesto
+
+    def espera(self, intento):
+        # intento 0 -> base, 1 -> base*factor, ...; el jitter evita que varias
+        # sesiones reintenten al mismo tiempo contra el SUT
+        espera = min(self.maximo, self.base * self.factor ** intento)
+        return max(0.0, espera * (1 + random.uniform(-self.jitter, self.jitter)))
+
+POLITICA_DEFECTO = Politica()
+POLITICAS = {
+    "pasos_criticos": Politica(intentos=5, base=0.5, maximo=8.0, presupuesto=90),
+    "seleccionar_causa": Politica(intentos=3, base=0.5, presupuesto=20),
+    "escribir": Politica(intentos=3, base=0.2, presupuesto=15),
+    "llenar_seccion": Politica(intentos=3, base=0.2, presupuesto=15),
+    "decimo_tercero": Politica(intentos=5, base=0.25, presupuesto=20),
+    "http_fila": Politica(intentos=3, base=1.0, maximo=15.0, presupuesto=120),
+}
+
+# --- Clasificación de errores ---
+class ErrorFatal(RuntimeError):
+    # Reintentar no puede arreglarlo (sesión expirada, dato inválido, ...)
+    pass
+
+class ReintentosAgotados(RuntimeError):
+    pass
+
+# Errores de datos o de programación, sesiones de Chrome perdidas y pasos que ya
+# agotaron sus propios reintentos
+FATALES = (ErrorFatal, ReintentosAgotados, ValueError, TypeError, KeyError, AttributeError)
+_FATALES_POR_NOMBRE = {"InvalidSessionIdException", "NoSuchWindowException", "SessionNotCreatedException"}
+_MENSAJES_FATALES = ("chrome not reachable", "disconnected", "target window already closed")
+
+def es_reintentable(error):
+    if isinstance(error, FATALES) or type(error).__name__ in _FATALES_POR_NOMBRE:
+        return False
+    mensaje = str(error).lower()
+    if any(m in mensaje for m in _MENSAJES_FATALES):
+        return False
+    # HTTP: 4xx es un error del pedido (salvo 408/429); 5xx y errores de red se reintentan
+    estado = getattr(getattr(error, "response", None), "status_code", None)
+    if estado is not None and 400 <= estado < 500 and estado not in (408, 429):
+        return False
+    return True
+
+# --- Interruptor: pausa el lote cuando el SUT está degradado ---
+class Interruptor:
+    def __init__(self, umbral=6, pausa=30.0, pausa_maxima=300.0):
+        self.umbral = umbral
+        self.pausa = pausa
+        self.pausa_maxima = pausa_maxima
+        self.fallos_seguidos = 0
+        self.aperturas = 0
+        self.abierto_hasta = 0.0
+        self._candado = threading.Lock()
+
+    def antes(self):
+        # Bloquea mientras el interruptor está abierto; al vencer la pausa pasa a
+        # semiabierto: los intentos siguientes son de prueba y su resultado decide
+        with self._candado:
+            restante = self.abierto_hasta - time.monotonic()
+        if restante > 0:
+            time.sleep(restante)
+
+    def exito(self):
+        with self._candado:
+            if self.aperturas:
+                print("🔌 SUT recuperado, se reanuda el lote")
+            self.fallos_seguidos = 0
+            self.aperturas = 0
+
+    def fallo(self):
+        with self._candado:
+            ahora = time.monotonic()
+            if ahora < self.abierto_hasta:
+                # Intento que empezó antes de la pausa: ya está contado en la apertura
+                return
+            self.fallos_seguidos += 1
+            semiabierto = self.aperturas > 0
+            if not semiabierto and self.fallos_seguidos < self.umbral:
+                return
+            # Cerrado: se abre al llegar al umbral. Semiabierto: el primer fallo
+            # tras la pausa vuelve a abrir, con la pausa duplicada.
+            pausa = min(self.pausa_maxima, self.pausa * 2 ** self.aperturas)
+            self.aperturas += 1
+            self.fallos_seguidos = 0
+            self.abierto_hasta = ahora + pausa
+        if semiabierto:
+            print(f"🔌 El SUT sigue degradado tras la pausa: lote en pausa {pausa:.0f} s")
+        else:
+            print(f"🔌 SUT degradado ({self.umbral} fallos seguidos): lote en pausa {pausa:.0f} s")
+
+# --- Estadísticas por paso ---
+_estadisticas = {}
+_candado_estadisticas = threading.Lock()
+_interruptor = Interruptor()
+
+def _sumar(paso, **valores):
+    with _candado_estadisticas:
+        actual = _estadisticas.setdefault(
+            paso, {"llamadas": 0, "exitos": 0, "reintentos": 0, "fatales": 0, "agotados": 0, "espera_s": 0.0}
+        )
+        for clave, valor in valores.items():
+            actual[clave] += valor
+
+def estadisticas():
+    with _candado_estadisticas:
+        return {paso: dict(valores, espera_s=round(valores["espera_s"], 3))
+                for paso, valores in _estadisticas.items()}
+
+def imprimir_estadisticas():
+    resumen = estadisticas()
+    if not any(r["reintentos"] or r["fatales"] or r["agotados"] for r in resumen.values()):
+        return
+    print("🔁 Reintentos por paso")
+    print(f"   {'paso':<24}{'llamadas':>9}{'reint.':>8}{'fatales':>9}{'agotados':>10}{'espera s':>10}")
+    for paso, r in resumen.items():
+        print(f"   {paso:<24}{r['llamadas']:>9}{r['reintentos']:>8}{r['fatales']:>9}{r['agotados']:>10}"
+              f"{r['espera_s']:>10.1f}")
+
+def configurar(ruta):
+    # JSON con {"paso": {"intentos": 5, "base": 0.5, ...}, "interruptor": {"umbral": 6, ...}}
+    global _interruptor
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    _interruptor = Interruptor(**datos.pop("interruptor", {}))
+    for paso, parametros in datos.items():
+        POLITICAS[paso] = Politica(**parametros)
+
+def interruptor():
+    return _interruptor
+
+# --- Ejecución con reintentos ---
+_ambito = threading.local()
+
+def ejecutar(paso, funcion, al_fallar=None, detalle=None):
+    # Llama a funcion() hasta que no lance excepción, según la política del paso.
+    # al_fallar(error) se ejecuta antes de cada reintento (invalidar caché, etc.).
+    # Dentro de otro ejecutar (ej. escribir dentro de pasos_criticos) se hace un solo
+    # intento: reintenta solo el ámbito externo y solo él cuenta para el interruptor.
+    if getattr(_ambito, "activo", False):
+        _sumar(paso, llamadas=1)
+        resultado = funcion()
+        _sumar(paso, exitos=1)
+        return resultado
+    _ambito.activo = True
+    try:
+        return _ejecutar(paso, funcion, al_fallar, detalle)
+    finally:
+        _ambito.activo = False
+
+def _ejecutar(paso, funcion, al_fallar, detalle):
+    politica = POLITICAS.get(paso, POLITICA_DEFECTO)
+    nombre = f"{paso} ({detalle})" if detalle else paso
+    inicio = time.monotonic()
+    for intento in range(politica.intentos):
+        _interruptor.antes()
+        _sumar(paso, llamadas=1)
+        try:
+            resultado = funcion()
+        except Exception as e:
+            if not es_reintentable(e):
+                _sumar(paso, fatales=1)
+                raise
+            _interruptor.fallo()
+            espera = politica.espera(intento)
+            transcurrido = time.monotonic() - inicio
+            if intento + 1 >= politica.intentos or (
+                politica.presupuesto is not None and transcurrido + espera > politica.presupuesto
+            ):
+                _sumar(paso, agotados=1)
+                raise ReintentosAgotados(
+                    f"❌ {nombre}: sin éxito después de {intento + 1} intentos ({transcurrido:.1f} s): {e}"
+                ) from e
+            print(f"⚠️ {nombre}: intento {intento + 1}/{politica.intentos} fallido: {e} "
+                  f"(reintento en {espera:.1f} s)")
+            trazas.reintento()
+            _sumar(paso, reintentos=1, espera_s=espera)
+            if al_fallar is not None:
+                al_fallar(e)
+            time.sleep(espera)
+        else:
+            _interruptor.exito()
+            _sumar(paso, exitos=1)
+            return resultado
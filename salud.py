@@ -0,0 +1,139 @@
+import statistics
+
+# Monitor de salud de la pestaña: en lotes largos el DOM y el heap de JS crecen con
+# cada diálogo de PrimeFaces (dttRemu001, j_idt600, datepicker) y las filas se
+# vuelven más lentas. Cuando se cruza un umbral se recicla la pestaña (o la sesión
+# WebDriver completa si la pestaña no responde) y el lote sigue en la próxima fila.
+
+LIMITE_HEAP_MB = 400
+LIMITE_NODOS = 100_000
+FACTOR_LATENCIA = 2.0
+VENTANA = 20
+CADA = 10
+
+def metricas(driver):
+    # Performance.getMetrics de DevTools: JSHeapUsedSize, Nodes, JSEventListeners, ...
+    driver.execute_cdp_cmd("Performance.enable", {})
+    respuesta = driver.execute_cdp_cmd("Performance.getMetrics", {})
+    return {m["name"]: m["value"] for m in respuesta.get("metrics", [])}
+
+def reciclar_pestana(driver):
+    # Pestaña nueva en el mismo perfil: conserva las cookies de la sesión del SUT
+    # y descarta el DOM y el heap de la anterior
+    anterior = driver.current_window_handle
+    driver.switch_to.new_window("tab")
+    nueva = driver.current_window_handle
+    driver.switch_to.window(anterior)
+    driver.close()
+    driver.switch_to.window(nueva)
+    return driver
+
+# --- Opciones de línea de comandos (autofill.py y demonio.py servir) ---
+def agregar_opciones(parser):
+    parser.add_argument("--max-heap-mb", type=float, default=LIMITE_HEAP_MB,
+                        help="Reciclar la pestaña si el heap JS supera estos MB (0 = sin límite)")
+    parser.add_argument("--max-nodos", type=int, default=LIMITE_NODOS,
+                        help="Reciclar la pestaña si el DOM supera estos nodos (0 = sin límite)")
+    parser.add_argument("--max-latencia", type=float, default=FACTOR_LATENCIA,
+                        help="Reciclar si la latencia por fila supera N veces la del inicio (0 = sin límite)")
+
+def limites(args):
+    # Argumentos de MonitorSalud; un dict para poder pasarlo a otros procesos
+    return {"heap_mb": args.max_heap_mb, "nodos": args.max_nodos, "factor_latencia": args.max_latencia}
+
+class MonitorSalud:
+    def __init__(self, conectar, cargar, heap_mb=LIMITE_HEAP_MB, nodos=LIMITE_NODOS,
+                 factor_latencia=FACTOR_LATENCIA, ventana=VENTANA, cada=CADA):
+        # conectar() devuelve un driver nuevo; cargar(driver) deja el formulario listo
+        self.conectar = conectar
+        self.cargar = cargar
+        self.heap_mb = heap_mb
+        self.nodos = nodos
+        self.factor_latencia = factor_latencia
+        self.ventana = ventana
+        self.cada = cada
+        self.driver = None
+        self.reciclajes = []
+        self.ultima_muestra = {}
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.latencias = []
+        self.base = None
+        self.filas = 0
+
+    def motivo(self, driver):
+        # Devuelve por qué hay que reciclar, o None si la pestaña está sana
+        if len(self.latencias) >= 2 * self.ventana and self.factor_latencia:
+            if self.base is None:
+                self.base = statistics.median(self.latencias[:self.ventana])
+            reciente = statistics.median(self.latencias[-self.ventana:])
+            if self.base > 0 and reciente > self.factor_latencia * self.base:
+                return f"latencia p50 {reciente:.1f} s (base {self.base:.1f} s)"
+        if self.filas % self.cada:
+            return None
+        try:
+            self.ultima_muestra = metricas(driver)
+        except Exception as e:
+            return f"la pestaña no responde a DevTools ({e})"
+        heap_mb = self.ultima_muestra.get("JSHeapUsedSize", 0) / 2 ** 20
+        nodos = self.ultima_muestra.get("Nodes", 0)
+        if self.heap_mb and heap_mb > self.heap_mb:
+            return f"heap JS {heap_mb:.0f} MB"
+        if self.nodos and nodos > self.nodos:
+            return f"{nodos:.0f} nodos DOM"
+        return None
+
+    def despues_de_fila(self, driver, duracion):
+        # Se llama al cerrar cada fila; devuelve el driver con el que seguir
+        self.driver = driver
+        self.filas += 1
+        self.latencias.append(duracion)
+        del self.latencias[self.ventana:-self.ventana]
+        motivo = self.motivo(driver)
+        if motivo is None:
+            return driver
+        return self.reciclar(driver, motivo)
+
+    def reciclar(self, driver, motivo):
+        print(f"♻️ Reciclando la pestaña tras {self.filas} filas: {motivo}")
+        try:
+            driver = reciclar_pestana(driver)
+            self.cargar(driver)
+            tipo = "pestaña"
+        except Exception as e:
+            print(f"⚠️ No se pudo reciclar la pestaña ({e}), reconectando la sesión WebDriver...")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = self.conectar()
+            self.cargar(driver)
+            tipo = "sesión"
+        self.reciclajes.append({"fila": self.filas, "tipo": tipo, "motivo": motivo})
+        self.driver = driver
+        self._reiniciar()
+        self._ajustar_limites(driver)
+        return driver
+
+    def _ajustar_limites(self, driver):
+        # Si la pestaña recién cargada ya supera un límite, reciclar no sirve:
+        # el límite se duplica para no reciclar en cada muestra
+        try:
+            muestra = metricas(driver)
+        except Exception:
+            return
+        heap_mb = muestra.get("JSHeapUsedSize", 0) / 2 ** 20
+        if self.heap_mb and heap_mb > self.heap_mb:
+            self.heap_mb *= 2
+            print(f"⚠️ El formulario recién cargado ya usa {heap_mb:.0f} MB: límite de heap ahora {self.heap_mb:.0f} MB")
+        if self.nodos and muestra.get("Nodes", 0) > self.nodos:
+            self.nodos *= 2
+            print(f"⚠️ El formulario recién cargado ya supera el límite de nodos: ahora {self.nodos}")
+
+    def imprimir_resumen(self):
+        if not self.reciclajes:
+            return
+        print(f"♻️ Reciclajes: {len(self.reciclajes)}")
+        for r in self.reciclajes:
+            print(f"   tras {r['fila']} filas ({r['tipo']}): {r['motivo']}")
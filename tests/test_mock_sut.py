@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("requests")
+
+import conciliacion
+import mock_sut
+from http_sut import ClienteSUT, procesar_concurrente
+from validacion import validar
+
+@pytest.fixture
+def sut():
+    mock_sut._actas.clear()
+    mock_sut._sesiones.clear()
+    servidor, url = mock_sut.iniciar_servidor()
+    yield url
+    servidor.shutdown()
+    servidor.server_close()
+    mock_sut._actas.clear()
+    mock_sut._sesiones.clear()
+
+def _filas(n):
+    filas = [{
+        "Identificacion": f"{1700000001 + i:010d}", "Remuneracion": "1200.00", "Causa": "8",
+        "Mes": "Agosto", "Año": "2025", "Salario_pendiente": "300", "Sueldo_nominal": "1200",
+        "Horas_suplementarias": "2", "Horas_extraordinarias": "0", "Horas_nocturnas": "0",
+        "Cumplimiento_laboral": "0", "Comision_por_responsabilidad": "0",
+        "Total_remuneracion_pendiente": "2400", "Fondo de reserva": "si", "Valor FR": "99.96",
+        "XIII": "si", "Fecha XIII": "15/12/2024", "Obs XIII": "", "Enviado": "",
+    } for i in range(n)]
+    limpios, rechazos = validar(pd.DataFrame(filas))
+    assert rechazos.empty
+    return limpios
+
+# --- Motor HTTP contra el SUT local ---
+def test_procesar_fila_llena_el_acta(sut):
+    cliente = ClienteSUT(sut)
+    assert cliente.procesar_fila(_filas(1).iloc[0]) == "1700000001"
+
+    estado = mock_sut._sesiones[cliente.sesion.cookies.get("JSESSIONID")]
+    assert estado.acta == "1700000001"
+    assert estado.causa == "8"
+    assert estado.remuneracion and not estado.dialogo
+    assert estado.fondo_reserva
+    assert estado.valores["frmLegal:j_idt600:0:j_idt607"] == "99.96"
+    assert estado.valores["frmLegal:txtSueldoDecimo00001"] == "200.00"
+    assert mock_sut._actas == ["1700000001"]
+
+def test_procesar_concurrente_una_sesion_por_hilo(sut):
+    limpios = _filas(9)
+    resultados = list(procesar_concurrente(limpios.to_dict("records"), [], url=sut, hilos=3))
+
+    assert [error for _, error, _ in resultados] == [None] * 9
+    assert {identificacion for identificacion, _, _ in resultados} == set(limpios["Identificacion"])
+    assert 1 <= len(mock_sut._sesiones) <= 3
+    assert sorted(mock_sut._actas) == sorted(limpios["Identificacion"])
+
+# --- Conciliación: el listado se recorre por filas ---
+def test_actas_registradas_con_pagina_de_pasaportes(sut):
+    cedulas = [f"{1700000000 + i:010d}" for i in range(150)]
+    pasaportes = [f"P{i:07d}" for i in range(120)]
+    ultimas = [f"{900000000 + i:010d}" for i in range(30)]
+    mock_sut._actas.extend(cedulas + pasaportes + ultimas)
+
+    url = sut.replace(mock_sut.RUTA, mock_sut.RUTA_ACTAS)
+    # El SUT local entrega como mucho 100 filas aunque se pidan 500
+    assert conciliacion.actas_registradas({}, url=url) == set(cedulas + ultimas)
@@ -0,0 +1,74 @@
+import pytest
+
+import reintentos
+from reintentos import Interruptor, Politica, ReintentosAgotados
+
+@pytest.fixture
+def sin_interruptor(monkeypatch):
+    monkeypatch.setattr(reintentos, "_interruptor", Interruptor(umbral=1000))
+
+# --- Ámbitos anidados: reintenta solo el externo ---
+def test_ejecutar_anidado_no_multiplica_intentos(monkeypatch, sin_interruptor):
+    monkeypatch.setitem(reintentos.POLITICAS, "externo", Politica(intentos=3, base=0, jitter=0))
+    monkeypatch.setitem(reintentos.POLITICAS, "interno", Politica(intentos=5, base=0, jitter=0))
+    llamadas = []
+
+    def interno():
+        llamadas.append(1)
+        raise TimeoutError("el SUT no responde")
+
+    with pytest.raises(ReintentosAgotados):
+        reintentos.ejecutar("externo", lambda: reintentos.ejecutar("interno", interno))
+    assert len(llamadas) == 3
+
+def test_ejecutar_anidado_recupera_en_el_externo(monkeypatch, sin_interruptor):
+    monkeypatch.setitem(reintentos.POLITICAS, "externo", Politica(intentos=3, base=0, jitter=0))
+    llamadas = []
+
+    def interno():
+        llamadas.append(1)
+        if len(llamadas) < 2:
+            raise TimeoutError("el SUT no responde")
+        return "ok"
+
+    assert reintentos.ejecutar("externo", lambda: reintentos.ejecutar("interno", interno)) == "ok"
+    assert len(llamadas) == 2
+
+# --- Interruptor: cerrado -> abierto -> semiabierto ---
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [0.0]
+    monkeypatch.setattr(reintentos.time, "monotonic", lambda: ahora[0])
+    return ahora
+
+def test_interruptor_abre_al_llegar_al_umbral(reloj):
+    interruptor = Interruptor(umbral=3, pausa=10)
+    interruptor.fallo()
+    interruptor.fallo()
+    assert interruptor.abierto_hasta == 0.0
+    interruptor.fallo()
+    assert interruptor.abierto_hasta == 10.0
+
+def test_interruptor_semiabierto_reabre_al_primer_fallo(reloj):
+    interruptor = Interruptor(umbral=3, pausa=10)
+    for _ in range(3):
+        interruptor.fallo()
+    # Fallos de intentos que empezaron antes de la pausa no cuentan
+    reloj[0] = 5.0
+    interruptor.fallo()
+    assert interruptor.abierto_hasta == 10.0
+    # Vencida la pausa, un solo fallo vuelve a abrir con la pausa duplicada
+    reloj[0] = 11.0
+    interruptor.fallo()
+    assert interruptor.abierto_hasta == 31.0
+    assert interruptor.aperturas == 2
+
+def test_interruptor_se_cierra_con_un_exito(reloj):
+    interruptor = Interruptor(umbral=3, pausa=10)
+    for _ in range(3):
+        interruptor.fallo()
+    reloj[0] = 11.0
+    interruptor.exito()
+    interruptor.fallo()
+    assert interruptor.abierto_hasta == 10.0
+    assert interruptor.aperturas == 0
@@ -0,0 +1,30 @@
+import pandas as pd
+
+import autofill
+import bitacora as bitacora_mod
+
+class _SaludRota:
+    def __init__(self):
+        self.llamadas = 0
+
+    def despues_de_fila(self, driver, duracion):
+        self.llamadas += 1
+        raise RuntimeError("Chrome no responde")
+
+    def imprimir_resumen(self):
+        pass
+
+# --- La fila queda en la bitácora aunque el reciclaje falle ---
+def test_procesar_lote_registra_antes_de_reciclar(tmp_path, monkeypatch):
+    monkeypatch.setattr(autofill, "procesar_fila", lambda driver, row: None)
+    monkeypatch.setattr(autofill, "volver_a_busqueda", lambda driver, url: None)
+    bitacora = bitacora_mod.Bitacora(str(tmp_path / "bitacora.sqlite3"))
+    salud = _SaludRota()
+    df_datos = pd.DataFrame({"Identificacion": ["1700000001", "1700000002"]})
+
+    resumen = autofill.procesar_lote(None, df_datos, bitacora, salud=salud)
+
+    assert salud.llamadas == 1
+    assert bitacora.enviados() == {"1700000001"}
+    assert resumen["procesadas"] == 1
+    bitacora.cerrar()
@@ -0,0 +1,33 @@
+import datetime
+
+import openpyxl
+import pandas as pd
+
+import entrada
+from validacion import a_fecha, validar
+
+def _fila(fecha):
+    return {"Identificacion": "1700000001", "Remuneracion": "1000", "Causa": "1",
+            "XIII": "si", "Fecha XIII": fecha}
+
+# --- Fechas ISO: no se invierten día y mes ---
+def test_a_fecha_iso_no_invierte_dia_y_mes():
+    fechas = a_fecha(pd.Series(["2025-08-03", "2025-08-03 00:00:00", "03/08/2025", "45872"]))
+    assert fechas.tolist() == [pd.Timestamp(2025, 8, 3)] * 4
+
+def test_validar_fecha_de_read_excel():
+    limpios, rechazos = validar(pd.DataFrame([_fila("2025-08-03 00:00:00")]))
+    assert rechazos.empty
+    assert limpios["Fecha XIII"].iloc[0] == pd.Timestamp(2025, 8, 3)
+
+def test_validar_bloques_celda_de_fecha_xlsx(tmp_path):
+    ruta = tmp_path / "datos.xlsx"
+    libro = openpyxl.Workbook()
+    hoja = libro.active
+    fila = _fila(datetime.datetime(2025, 8, 3))
+    hoja.append(list(fila))
+    hoja.append(list(fila.values()))
+    libro.save(ruta)
+
+    limpios = pd.concat(entrada.validar_bloques(entrada.leer_bloques(str(ruta))))
+    assert limpios["Fecha XIII"].iloc[0] == pd.Timestamp(2025, 8, 3)
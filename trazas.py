@@ -0,0 +1,136 @@
+import csv
+import datetime
+import json
+import os
+import time
+from contextlib import contextmanager
+
+CAMPOS = ["fila", "paso", "inicio", "duracion_s", "reintentos", "comandos", "ok", "error"]
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100
+    inferior = int(k)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (k - inferior)
+
+# --- Traza de una ejecución: tramos por fila y paso ---
+class Traza:
+    def __init__(self, ruta=None):
+        self.ruta = ruta
+        self.tramos = []
+        self.comandos = 0
+        self.fila = None
+        self._fila_tramos = []
+        self._pila = []
+
+    def instrumentar(self, driver):
+        # Todo comando WebDriver (también los de WebElement) pasa por driver.execute
+        original = driver.execute
+        def _execute(comando, params=None):
+            self.comandos += 1
+            return original(comando, params)
+        driver.execute = _execute
+        return driver
+
+    def iniciar_fila(self, identificacion):
+        self.fila = str(identificacion)
+        self._fila_tramos = []
+
+    def cerrar_fila(self):
+        tramos, self._fila_tramos = self._fila_tramos, []
+        self.agregar(tramos)
+        return tramos
+
+    def agregar(self, tramos):
+        self.tramos.extend(tramos)
+        if self.ruta and tramos:
+            self._escribir(tramos)
+
+    def _escribir(self, tramos):
+        if self.ruta.lower().endswith(".csv"):
+            nuevo = not os.path.exists(self.ruta) or os.path.getsize(self.ruta) == 0
+            with open(self.ruta, "a", newline="", encoding="utf-8") as f:
+                escritor = csv.DictWriter(f, fieldnames=CAMPOS)
+                if nuevo:
+                    escritor.writeheader()
+                escritor.writerows(tramos)
+        else:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                for t in tramos:
+                    f.write(json.dumps(t, ensure_ascii=False) + "\n")
+
+    def resumen(self):
+        por_paso = {}
+        for t in self.tramos:
+            por_paso.setdefault(t["paso"], []).append(t)
+        return {
+            paso: {
+                "n": len(ts),
+                "p50": percentil([t["duracion_s"] for t in ts], 50),
+                "p95": percentil([t["duracion_s"] for t in ts], 95),
+                "max": max(t["duracion_s"] for t in ts),
+                "reintentos": sum(t["reintentos"] for t in ts),
+                "comandos": sum(t["comandos"] for t in ts) / len(ts),
+            }
+            for paso, ts in por_paso.items()
+        }
+
+    def imprimir_resumen(self):
+        resumen = self.resumen()
+        if not resumen:
+            return
+        print("⏱️ Tiempos por paso (s)")
+        print(f"   {'paso':<24}{'n':>5}{'p50':>8}{'p95':>8}{'max':>8}{'reint.':>8}{'cmd/fila':>10}")
+        for paso, r in resumen.items():
+            print(f"   {paso:<24}{r['n']:>5}{r['p50']:>8.2f}{r['p95']:>8.2f}{r['max']:>8.2f}"
+                  f"{r['reintentos']:>8}{r['comandos']:>10.1f}")
+
+# --- Traza activa del proceso ---
+_activa = None
+
+def activar(traza):
+    global _activa
+    _activa = traza
+    return traza
+
+def actual():
+    return _activa
+
+@contextmanager
+def tramo(nombre):
+    traza = _activa
+    if traza is None:
+        yield
+        return
+    registro = {
+        "fila": traza.fila,
+        "paso": nombre,
+        "inicio": datetime.datetime.now().isoformat(timespec="milliseconds"),
+        "duracion_s": 0.0,
+        "reintentos": 0,
+        "comandos": 0,
+        "ok": True,
+        "error": None,
+    }
+    comandos_inicio = traza.comandos
+    inicio = time.perf_counter()
+    traza._pila.append(registro)
+    try:
+        yield
+    except Exception as e:
+        registro["ok"] = False
+        registro["error"] = str(e)
+        raise
+    finally:
+        traza._pila.pop()
+        registro["duracion_s"] = round(time.perf_counter() - inicio, 4)
+        registro["comandos"] = traza.comandos - comandos_inicio
+        traza._fila_tramos.append(registro)
+
+def reintento():
+    # Los bucles de reintento lo llaman para sumar al tramo en curso
+    if _activa is not None and _activa._pila:
+        _activa._pila[-1]["reintentos"] += 1
@@ -0,0 +1,141 @@
+import unicodedata
+
+import pandas as pd
+
+# --- Columnas esperadas en el Excel ---
+OBLIGATORIAS = ["Identificacion", "Remuneracion", "Causa"]
+NUMERICAS = [
+    "Remuneracion", "Salario_pendiente", "Sueldo_nominal", "Horas_suplementarias",
+    "Horas_extraordinarias", "Horas_nocturnas", "Cumplimiento_laboral",
+    "Comision_por_responsabilidad", "Total_remuneracion_pendiente", "Valor FR",
+]
+BANDERAS = ["Fondo de reserva", "XIII"]
+TEXTOS = ["Mes", "Año", "Fecha XIII", "Obs XIII", "Enviado"]
+
+MESES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio",
+         "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+_SI = {"si", "s", "1", "x", "true", "verdadero"}
+_NO = {"no", "n", "0", "false", "falso", ""}
+
+def _sin_tildes(serie):
+    return serie.map(
+        lambda t: unicodedata.normalize("NFKD", t).encode("ascii", "ignore").decode("ascii")
+    )
+
+def _limpiar_texto(serie):
+    return serie.fillna("").astype(str).str.strip()
+
+# --- Conversión vectorizada ---
+def a_numero(serie):
+    # Acepta "1.234,56", "1,234.56", "1234,56", "$ 950.5"; lo demás queda NaN
+    texto = _limpiar_texto(serie).str.replace(r"[\s$]", "", regex=True)
+    con_ambos = texto.str.contains(",", regex=False) & texto.str.contains(".", regex=False)
+    coma_decimal = con_ambos & (texto.str.rfind(",") > texto.str.rfind("."))
+    texto = texto.where(~coma_decimal, texto.str.replace(".", "", regex=False))
+    texto = texto.where(~(con_ambos & ~coma_decimal), texto.str.replace(",", "", regex=False))
+    texto = texto.str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce")
+
+def a_fecha(serie):
+    # Números de serie de Excel (días desde 1899-12-30), fechas ISO (lo que devuelven
+    # read_excel y openpyxl para celdas de fecha) o fechas en texto día/mes/año
+    texto = _limpiar_texto(serie).str.replace(r"\.0$", "", regex=True)
+    serial = texto.str.fullmatch(r"\d{1,6}")
+    iso = texto.str.match(r"^\d{4}-\d{2}-\d{2}")
+    fechas = pd.to_datetime(texto.where(iso), errors="coerce", format="ISO8601")
+    fechas = fechas.where(iso, pd.to_datetime(texto.where(~iso & ~serial), errors="coerce",
+                                              dayfirst=True, format="mixed"))
+    dias = pd.to_numeric(texto.where(serial), errors="coerce")
+    desde_serial = pd.Timestamp(1899, 12, 30) + pd.to_timedelta(dias, unit="D")
+    return fechas.where(~serial, desde_serial)
+
+def a_texto(valor):
+    # Valor de una celda ya validada -> texto para el formulario
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ""
+    if isinstance(valor, float):
+        # Los montos validados llegan como float: 1100.0 -> "1100", 950.5 -> "950.5"
+        return f"{valor:.2f}".rstrip("0").rstrip(".")
+    return str(valor)
+
+def a_bandera(serie):
+    texto = _sin_tildes(_limpiar_texto(serie).str.lower())
+    return texto.map(lambda t: "si" if t in _SI else ("no" if t in _NO else None))
+
+def a_mes(serie):
+    texto = _sin_tildes(_limpiar_texto(serie).str.lower())
+    por_nombre = {m.lower(): m for m in MESES}
+    por_nombre["setiembre"] = "Septiembre"
+    por_numero = {str(i): m for i, m in enumerate(MESES, start=1)}
+    por_numero.update({f"{i:02d}": m for i, m in enumerate(MESES, start=1)})
+    return texto.map(lambda t: por_nombre.get(t) or por_numero.get(t.replace(".0", "")))
+
+# --- Etapa previa al navegador ---
+def validar(df_datos, causas_validas=None):
+    # Devuelve (limpios, rechazos). Los limpios llevan columnas tipadas; los
+    # rechazos conservan los valores originales y la columna Motivo.
+    faltantes = [c for c in OBLIGATORIAS if c not in df_datos.columns]
+    if faltantes:
+        raise ValueError(f"❌ Faltan columnas obligatorias en el Excel: {', '.join(faltantes)}")
+
+    df = df_datos.copy()
+    for columna in NUMERICAS + BANDERAS + TEXTOS:
+        if columna not in df.columns:
+            df[columna] = ""
+
+    motivos = pd.Series("", index=df.index)
+    def _rechazar(mascara, motivo):
+        nonlocal motivos
+        motivos = motivos.where(~mascara, motivos + "; " + motivo)
+
+    df["Identificacion"] = _limpiar_texto(df["Identificacion"]).str.replace(r"\.0$", "", regex=True)
+    _rechazar(df["Identificacion"] == "", "Identificacion vacía")
+    _rechazar(df["Identificacion"].duplicated(keep="first") & (df["Identificacion"] != ""),
+              "Identificacion repetida")
+
+    for columna in NUMERICAS:
+        crudo = _limpiar_texto(df[columna])
+        numero = a_numero(crudo)
+        _rechazar(numero.isna() & (crudo != ""), f"{columna} no numérico")
+        df[columna] = numero if columna in OBLIGATORIAS else numero.fillna(0.0)
+    _rechazar(_limpiar_texto(df_datos["Remuneracion"]) == "", "Remuneracion vacía")
+
+    causa = a_numero(df["Causa"])
+    causa = causa.where(causa % 1 == 0)
+    _rechazar(causa.isna(), "Causa inválida")
+    df["Causa"] = causa.astype("Int64").astype(str).where(causa.notna(), "")
+    if causas_validas is not None:
+        validas = {str(c) for c in causas_validas}
+        _rechazar(causa.notna() & ~df["Causa"].isin(validas), "Causa no existe en el SUT")
+
+    for columna in BANDERAS:
+        bandera = a_bandera(df[columna])
+        _rechazar(bandera.isna(), f"{columna} debe ser si/no")
+        df[columna] = bandera.fillna("no")
+
+    df["Mes"] = a_mes(df["Mes"])
+    anio = a_numero(df["Año"])
+    anio = anio.where(anio.between(1990, 2100) & (anio % 1 == 0))
+    anio_valido = anio.notna()
+    df["Año"] = anio.astype("Int64").astype(str).where(anio_valido, "")
+    periodo_requerido = (df["Salario_pendiente"] > 0) | (df["Fondo de reserva"] == "si")
+    _rechazar(periodo_requerido & df["Mes"].isna(), "Mes inválido")
+    _rechazar(periodo_requerido & ~anio_valido, "Año inválido")
+    df["Mes"] = df["Mes"].fillna("")
+    _rechazar((df["Fondo de reserva"] == "si") & (df["Valor FR"] <= 0), "Valor FR requerido")
+
+    crudo_fecha = _limpiar_texto(df["Fecha XIII"])
+    fecha = a_fecha(crudo_fecha)
+    _rechazar(fecha.isna() & (crudo_fecha != ""), "Fecha XIII no interpretable")
+    df["Fecha XIII"] = fecha
+    df["Obs XIII"] = _limpiar_texto(df["Obs XIII"])
+
+    motivos = motivos.str.lstrip("; ")
+    rechazados = motivos != ""
+    rechazos = df_datos.loc[rechazados].copy()
+    rechazos["Motivo"] = motivos[rechazados]
+    return df.loc[~rechazados], rechazos
+
+def guardar_rechazos(rechazos, ruta):
+    rechazos.to_csv(ruta, index=False, encoding="utf-8-sig")
+    print(f"⚠️ {len(rechazos)} filas rechazadas antes de abrir el navegador, detalle en {ruta}")